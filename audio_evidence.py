@@ -0,0 +1,452 @@
+# -------------------------------------------------------------------------
+# 음성 녹취 증거 분석 (구간 단위 파이프라인)
+# - 스트리밍 디코딩: WAV 는 표준 wave 모듈(정수 PCM 이 아니면 soundfile), MP3 는 soundfile(libsndfile 1.1 이상)이 설치되어 있으면 블록 단위 디코딩
+#   soundfile 이 없거나 MP3 를 열지 못하면 MP3 프레임 헤더만 읽어 프레임 경계에서 길이 기준으로 자름 (원본 프레임 그대로 전송)
+# - 무음 구간에서 분할 (최소/최대 길이 제한, 최대 길이에서는 가장 조용한 지점) → 16kHz 모노 WAV 로 재인코딩
+# - 전체가 무음인 구간은 전송하지 않음
+# - 구간 전사는 제한된 스레드 풀에서 동시에 실행하고, 메모리에 올라와 있는 구간 수도 제한 (1시간 녹음도 일정한 메모리)
+# - 모델 호출은 호출자가 넘기는 transcribe(segment) -> str (get_gemini_response 멀티모달 경로 / stub_transcriber)
+# - 결과는 절대 시각이 붙은 발화 목록(Transcript) → "갚을게" 같은 채무 승인 후보 발언 검색 (부정형 제외)
+# - 오디오 다이제스트 기준 메모리(LRU) + 디스크(.cache/transcripts) 캐시 → 같은 파일 재분석은 즉시 반환
+#
+# 환경 변수: LEGAL_AUDIO_STUB=1 이면 앱이 모델 대신 stub_transcriber 사용 (네트워크 없이 시험)
+# -------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import re
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from io import BytesIO
+
+import numpy as np
+
+SAMPLE_RATE = 16000         # 전송용 재인코딩 샘플레이트 (음성 인식에 충분, 60초 ≈ 1.9MB)
+BLOCK_MS = 50               # 디코딩/무음 판정 단위
+SILENCE_DB = -40.0          # 블록 RMS 가 이 값(dBFS) 미만이면 무음
+SILENCE_MS = 400            # 이 길이 이상 이어진 무음에서 분할
+MIN_SEGMENT_SEC = 15
+MAX_SEGMENT_SEC = 60
+CUT_SEARCH_SEC = 10         # 최대 길이 도달 시 마지막 N초 안에서 가장 조용한 블록을 찾아 자름
+MAX_WORKERS = 4
+MAX_IN_FLIGHT = 8           # 동시에 메모리에 있는 구간 수 (전사 대기 + 진행 중)
+READ_CHUNK = 1 << 20
+
+TRANSCRIPT_DIR = os.path.join(".cache", "transcripts")
+TRANSCRIPT_VERSION = 1
+TRANSCRIPT_MEM_ENTRIES = 16
+STUB_ENV = "LEGAL_AUDIO_STUB"
+
+# 채무 승인 취지의 표현 (띄어쓰기 무시 비교, 자동 판정이 아니라 사람이 검토할 후보)
+ADMISSION_PHRASES = ["갚을게", "갚을께", "갚겠", "갚아줄", "갚아드릴", "돌려줄게", "돌려줄께", "돌려주겠", "돌려드릴",
+                     "빌린거맞", "빌린건맞", "빌린돈맞", "내가빌렸", "빚진거맞", "인정할게", "인정합니다", "인정해요"]
+# 표현 바로 앞/뒤에 붙으면 부정·반문으로 보고 제외 ("안 빌렸어", "못 갚겠어", "갚을게 아니라", "내가 왜 갚겠냐")
+NEGATION_BEFORE = ("안", "못", "왜")
+NEGATION_AFTER = ("못", "않", "없", "아니", "냐")
+NEGATION_WINDOW = 4     # 표현 뒤로 살펴볼 글자 수 (띄어쓰기 제거 후)
+
+_mem = OrderedDict()
+_mem_lock = threading.Lock()
+
+
+class AudioSegment:
+    def __init__(self, index, start, duration, data, mime_type):
+        self.index = index
+        self.start = start          # 녹음 시작 기준 초
+        self.duration = duration
+        self.data = data
+        self.mime_type = mime_type
+
+    def as_part(self):
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+def format_ts(seconds):
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    return f"{h}:{rem // 60:02d}:{rem % 60:02d}" if h else f"{rem // 60:02d}:{rem % 60:02d}"
+
+
+def _as_stream(file):
+    if isinstance(file, (bytes, bytearray)): return BytesIO(file)
+    file.seek(0)
+    return file
+
+
+def audio_digest(file, namespace=()):
+    """오디오 내용 + 네임스페이스(모델, 프롬프트 등)의 다이제스트 (청크 단위로 읽음)."""
+    stream = _as_stream(file)
+    h = hashlib.sha256(json.dumps(list(namespace), ensure_ascii=False).encode("utf-8"))
+    for chunk in iter(lambda: stream.read(READ_CHUNK), b""): h.update(chunk)
+    stream.seek(0)
+    return h.hexdigest()
+
+
+# ---- 디코딩 ---------------------------------------------------------------
+def _pcm_to_float(raw, width, channels):
+    if width == 1:
+        x = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128) / 128
+    elif width == 3:
+        b = np.frombuffer(raw, np.uint8).reshape(-1, 3)
+        x = ((b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8) | (b[:, 2].astype(np.int32) << 16))
+             << 8 >> 8).astype(np.float32) / (1 << 23)
+    else:
+        dtype = {2: np.int16, 4: np.int32}[width]
+        x = np.frombuffer(raw, dtype).astype(np.float32) / np.iinfo(dtype).max
+    return x.reshape(-1, channels).mean(axis=1) if channels > 1 else x
+
+
+def _open_wav(stream):
+    # 표준 wave 모듈은 정수 PCM 만 읽음 → 32비트 부동소수점/WAVE_FORMAT_EXTENSIBLE/손상된 헤더는 None
+    pos = stream.tell()
+    try:
+        return wave.open(stream, "rb")
+    except (wave.Error, EOFError):
+        stream.seek(pos)
+        return None
+
+
+def iter_wav_blocks(w):
+    """열어 둔 wave 리더에서 (모노 float32 블록, 샘플레이트)를 BLOCK_MS 단위로 생성."""
+    with w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        frames = max(1, rate * BLOCK_MS // 1000)
+        while True:
+            raw = w.readframes(frames)
+            if not raw: break
+            yield _pcm_to_float(raw, width, channels), rate
+
+
+def iter_soundfile_blocks(stream):
+    import soundfile as sf
+    with sf.SoundFile(stream) as f:
+        rate = f.samplerate
+        for block in f.blocks(blocksize=max(1, rate * BLOCK_MS // 1000), dtype="float32", always_2d=True):
+            yield block.mean(axis=1), rate
+
+
+class _Resampler:
+    """블록 경계를 이어 가며 선형 보간으로 리샘플링 (내릴 때는 이동 평균으로 간단한 저역 통과)."""
+
+    def __init__(self, src_rate, dst_rate=SAMPLE_RATE):
+        self.step = src_rate / dst_rate
+        self.width = int(self.step) if self.step >= 2 else 1
+        self.pos = 0.0
+        self.last = None
+
+    def __call__(self, x):
+        if self.step == 1.0: return x
+        if self.width > 1: x = np.convolve(x, np.full(self.width, 1 / self.width, np.float32), mode="same")
+        buf = x if self.last is None else np.concatenate(([self.last], x))
+        n = int((len(buf) - 1 - self.pos) // self.step) + 1 if len(buf) - 1 >= self.pos else 0
+        out = np.interp(self.pos + np.arange(n) * self.step, np.arange(len(buf)), buf).astype(np.float32)
+        self.pos += n * self.step - (len(buf) - 1)   # 다음 블록에서는 이번 마지막 샘플이 buf[0]
+        self.last = buf[-1]
+        return out
+
+
+def iter_pcm(stream, name=""):
+    """16kHz 모노 float32 블록 생성 (WAV 또는 soundfile 로 읽을 수 있는 형식)."""
+    w = _open_wav(stream) if name.lower().endswith(".wav") else None
+    blocks = iter_wav_blocks(w) if w is not None else iter_soundfile_blocks(stream)
+    resample = None
+    for block, rate in blocks:
+        if resample is None: resample = _Resampler(rate)
+        out = resample(block)
+        if len(out): yield out
+
+
+def _encode_wav(blocks):
+    pcm = np.clip(np.concatenate(blocks), -1.0, 1.0)
+    buf = BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(SAMPLE_RATE)
+        w.writeframes((pcm * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def _db(block):
+    rms = float(np.sqrt(np.mean(block * block))) if len(block) else 0.0
+    return 20 * np.log10(rms) if rms > 1e-9 else -180.0
+
+
+def split_on_silence(blocks, silence_db=SILENCE_DB, silence_ms=SILENCE_MS, min_sec=MIN_SEGMENT_SEC,
+                     max_sec=MAX_SEGMENT_SEC):
+    """16kHz 블록을 무음 지점에서 나눠 AudioSegment(WAV)를 생성. 한 번에 최대 max_sec 분량만 보관."""
+    min_len, max_len = int(min_sec * SAMPLE_RATE), int(max_sec * SAMPLE_RATE)
+    silence_len, search_len = int(silence_ms * SAMPLE_RATE / 1000), int(CUT_SEARCH_SEC * SAMPLE_RATE)
+    cur, levels, cur_len, start, silent_run, index = [], [], 0, 0, 0, 0
+
+    def emit(parts, part_levels, offset):
+        length = sum(len(p) for p in parts)
+        if all(level < silence_db for level in part_levels): return None   # 전체 무음
+        return AudioSegment(index, offset / SAMPLE_RATE, length / SAMPLE_RATE, _encode_wav(parts), "audio/wav")
+
+    for block in blocks:
+        level = _db(block)
+        cur.append(block); levels.append(level); cur_len += len(block)
+        silent_run = silent_run + len(block) if level < silence_db else 0
+        if cur_len >= min_len and silent_run >= silence_len:
+            cut = len(cur)
+        elif cur_len >= max_len:
+            # 말이 끊기지 않고 이어지면 마지막 구간에서 가장 조용한 블록 뒤에서 자름
+            tail, k = 0, len(cur)
+            while k > 1 and tail < search_len:
+                k -= 1; tail += len(cur[k])
+            cut = min(range(k, len(cur)), key=levels.__getitem__) + 1
+        else:
+            continue
+        seg = emit(cur[:cut], levels[:cut], start)
+        if seg is not None:
+            yield seg
+            index += 1
+        done = sum(len(p) for p in cur[:cut])
+        start += done; cur_len -= done
+        cur, levels = cur[cut:], levels[cut:]
+        silent_run = 0
+    if cur:
+        seg = emit(cur, levels, start)
+        if seg is not None: yield seg
+
+
+# ---- MP3 (디코더 없이 프레임 단위 분할) --------------------------------------
+_MP3_BITRATES = {1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+                 2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]}
+_MP3_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}   # 버전 비트별
+
+
+def _mp3_frame(header):
+    """(프레임 길이, 재생 시간) 또는 None (Layer III 헤더만 인식)."""
+    if header[0] != 0xFF or header[1] & 0xE0 != 0xE0: return None
+    version, layer = (header[1] >> 3) & 3, (header[1] >> 1) & 3
+    br_idx, sr_idx, pad = header[2] >> 4, (header[2] >> 2) & 3, (header[2] >> 1) & 1
+    if version == 1 or layer != 1 or br_idx in (0, 15) or sr_idx == 3: return None
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[1 if mpeg1 else 2][br_idx] * 1000
+    rate = _MP3_RATES[version][sr_idx]
+    samples = 1152 if mpeg1 else 576
+    return samples // 8 * bitrate // rate + pad, samples / rate
+
+
+def iter_mp3_frames(stream):
+    """(프레임 바이트, 재생 시간) 생성. ID3v2 태그는 건너뛰고, 깨진 구간은 다음 동기 신호까지 재동기화."""
+    head = stream.read(10)
+    if head[:3] == b"ID3" and len(head) == 10:
+        size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        stream.read(size + (10 if head[5] & 0x10 else 0))
+        header = stream.read(4)
+    else:
+        header = head[:4]
+        stream.seek(-(len(head) - len(header)), 1)
+    while len(header) == 4:
+        frame = _mp3_frame(header)
+        if frame is None:
+            nxt = stream.read(1)
+            if not nxt: break
+            header = header[1:] + nxt
+            continue
+        body = stream.read(frame[0] - 4)
+        yield header + body, frame[1]
+        header = stream.read(4)
+
+
+def split_mp3_frames(stream, max_sec=MAX_SEGMENT_SEC):
+    # 비트 저장소(bit reservoir) 때문에 각 구간의 첫 프레임 몇 ms 는 디코더가 건너뛸 수 있음
+    frames, length, start, index = [], 0.0, 0.0, 0
+    for data, duration in iter_mp3_frames(stream):
+        frames.append(data); length += duration
+        if length >= max_sec:
+            yield AudioSegment(index, start, length, b"".join(frames), "audio/mp3")
+            index += 1; start += length
+            frames, length = [], 0.0
+    if frames: yield AudioSegment(index, start, length, b"".join(frames), "audio/mp3")
+
+
+def _soundfile_can_decode(stream):
+    # import 만 되는 것으로는 부족 → MP3 를 지원하지 않는 libsndfile(1.1 미만) 빌드는 열 때 실패
+    try:
+        import soundfile as sf
+    except (ImportError, OSError):
+        return False
+    pos = stream.tell()
+    try:
+        with sf.SoundFile(stream): return True
+    except RuntimeError:   # LibsndfileError (soundfile 0.11 이상은 RuntimeError 하위 클래스)
+        return False
+    finally:
+        stream.seek(pos)
+
+
+def split_audio(file, name=""):
+    stream = _as_stream(file)
+    name = name or getattr(file, "name", "")
+    if name.lower().endswith(".mp3") and not _soundfile_can_decode(stream): return split_mp3_frames(stream)
+    return split_on_silence(iter_pcm(stream, name))
+
+
+# ---- 전사 / 녹취록 --------------------------------------------------------
+# "[02:15] 화자1: 내용" / "[1:02:15] 내용" / "02:15 내용"
+_LINE_RE = re.compile(r"^\s*\[?(?:(\d{1,2}):)?(\d{1,2}):(\d{2})\]?\s*(?:([^:：\[\]]{1,12})\s*[:：])?\s*(.*)$")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(text):
+    return _SPACE_RE.sub("", text)
+
+
+def _affirms(norm, phrase):
+    # 부정/반문이 붙지 않은 위치가 하나라도 있으면 후보
+    i = norm.find(phrase)
+    while i >= 0:
+        after = norm[i + len(phrase):i + len(phrase) + NEGATION_WINDOW]
+        if not norm[:i].endswith(NEGATION_BEFORE) and not any(n in after for n in NEGATION_AFTER): return True
+        i = norm.find(phrase, i + 1)
+    return False
+
+
+def parse_segment(text, segment_start, segment_duration):
+    """모델 응답을 발화 목록으로 변환 (구간 내 상대 시각 → 녹음 전체 기준 시각)."""
+    entries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line: continue
+        m = _LINE_RE.match(line)
+        if m and m.group(5):
+            offset = int(m.group(1) or 0) * 3600 + int(m.group(2)) * 60 + int(m.group(3))
+            entries.append({"start": round(segment_start + min(offset, segment_duration), 2),
+                            "speaker": (m.group(4) or "").strip(), "text": m.group(5).strip()})
+        elif entries:
+            entries[-1]["text"] += " " + line
+        else:
+            entries.append({"start": round(segment_start, 2), "speaker": "", "text": line})
+    return entries
+
+
+class Transcript:
+    def __init__(self, digest, entries, duration=0.0, segments=0, failed=None):
+        self.digest = digest
+        self.entries = entries          # [{"start", "speaker", "text"}] 시각 순
+        self.duration = duration
+        self.segments = segments
+        self.failed = failed or []      # [{"start", "error"}] 전사에 실패한 구간
+        self._normalized = None
+
+    def search(self, query):
+        """띄어쓰기를 무시하고 query 가 들어 있는 발화 목록."""
+        needle = _normalize(query or "")
+        if not needle: return []
+        if self._normalized is None: self._normalized = [_normalize(e["text"]) for e in self.entries]
+        return [e for e, norm in zip(self.entries, self._normalized) if needle in norm]
+
+    def admissions(self, phrases=ADMISSION_PHRASES):
+        """채무 승인 후보 발언 (부정·반문 형태는 제외, 최종 판단은 사람이 검토)."""
+        if self._normalized is None: self._normalized = [_normalize(e["text"]) for e in self.entries]
+        return [e for e, norm in zip(self.entries, self._normalized) if any(_affirms(norm, p) for p in phrases)]
+
+    def to_text(self):
+        return "\n".join(f"[{format_ts(e['start'])}] " + (f"{e['speaker']}: " if e["speaker"] else "") + e["text"]
+                         for e in self.entries)
+
+    def to_json(self):
+        return {"version": TRANSCRIPT_VERSION, "digest": self.digest, "entries": self.entries,
+                "duration": self.duration, "segments": self.segments, "failed": self.failed}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["digest"], data["entries"], data["duration"], data["segments"], data.get("failed"))
+
+
+def transcribe_segments(segments, transcribe, workers=MAX_WORKERS, in_flight=MAX_IN_FLIGHT, progress=None):
+    """구간 생성기를 제한된 풀로 전사 → (발화 목록, 총 길이, 구간 수, 실패 목록). progress(완료 수, 진행 시각)."""
+    entries, failed, done, end = [], [], 0, 0.0
+    pending = {}
+
+    def collect(futures):
+        nonlocal done, end
+        for fut in futures:
+            start, duration = pending.pop(fut)
+            try: text = fut.result()
+            except Exception as e: text = f"❌ {e}"
+            if text.startswith("❌"): failed.append({"start": start, "error": text})
+            else: entries.extend(parse_segment(text, start, duration))
+            done += 1
+            end = max(end, start + duration)
+            if progress: progress(done, end)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for seg in segments:
+            pending[pool.submit(transcribe, seg)] = (seg.start, seg.duration)
+            del seg     # 전사가 끝나면 구간 오디오를 바로 놓아 줌
+            if len(pending) >= in_flight:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished)
+    entries.sort(key=lambda e: e["start"])
+    failed.sort(key=lambda f: f["start"])
+    return entries, end, done, failed
+
+
+def stub_transcriber(segment):
+    """네트워크 없이 파이프라인을 시험할 때 쓰는 전사기 (구간마다 고정 문장)."""
+    return (f"[00:00] 화자1: {segment.index + 1}번째 구간 ({segment.duration:.1f}초) 시험 전사입니다.\n"
+            f"[00:01] 화자2: 알겠어, 다음 달에 갚을게.")
+
+
+def use_stub():
+    return os.environ.get(STUB_ENV) == "1"
+
+
+def _transcript_path(digest, cache_dir):
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def _remember(transcript):
+    with _mem_lock:
+        _mem[transcript.digest] = transcript
+        _mem.move_to_end(transcript.digest)
+        while len(_mem) > TRANSCRIPT_MEM_ENTRIES: _mem.popitem(last=False)
+
+
+def load_transcript(digest, cache_dir=TRANSCRIPT_DIR):
+    with _mem_lock:
+        if digest in _mem:
+            _mem.move_to_end(digest)
+            return _mem[digest]
+    try:
+        with open(_transcript_path(digest, cache_dir), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != TRANSCRIPT_VERSION: return None
+        transcript = Transcript.from_json(data)
+    except (OSError, ValueError, KeyError):
+        return None
+    _remember(transcript)
+    return transcript
+
+
+def save_transcript(transcript, cache_dir=TRANSCRIPT_DIR):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = _transcript_path(transcript.digest, cache_dir) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(transcript.to_json(), f, ensure_ascii=False)
+        os.replace(tmp, _transcript_path(transcript.digest, cache_dir))
+    except OSError:
+        pass  # 디스크에 쓸 수 없으면 메모리에만 보관
+    _remember(transcript)
+
+
+def analyze_audio(file, transcribe, namespace=(), name="", progress=None, workers=MAX_WORKERS,
+                  cache_dir=TRANSCRIPT_DIR):
+    """녹음 파일 → (Transcript, 캐시 재사용 여부). 일부 구간이 실패한 결과는 캐시하지 않음."""
+    digest = audio_digest(file, namespace)
+    cached = load_transcript(digest, cache_dir)
+    if cached is not None: return cached, True
+    entries, duration, count, failed = transcribe_segments(split_audio(file, name), transcribe, workers,
+                                                           progress=progress)
+    transcript = Transcript(digest, entries, duration, count, failed)
+    if not failed: save_transcript(transcript, cache_dir)
+    return transcript, False
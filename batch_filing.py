@@ -0,0 +1,191 @@
+# -------------------------------------------------------------------------
+# 대량 서류 생성 (헤드리스 배치 모드)
+# - CSV/JSONL 사건 목록 → 관할/비용/증거목록/사건유형 계산 → AI 서류 생성 → DOCX/PDF zip
+# - tab1(서류 작성)과 같은 legal_core 로직과 프롬프트를 그대로 사용
+# - AI 호출은 제한된 워커 풀 + 분당 호출 한도 + 재시도(지수 백오프)로 처리
+#
+# 사용 예:
+#   python batch_filing.py cases.csv -o filings.zip --model models/gemini-1.5-flash --workers 4 --rpm 60
+#
+# 입력 컬럼: case_id, menu, party_a, party_b, amount, address, facts, evidence, court(선택)
+#   - evidence는 줄바꿈 또는 ';' 로 구분
+#   - menu를 비우면 "전자소송 (지급명령/채권자)" (지급명령신청서)로 처리
+# -------------------------------------------------------------------------
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from legal_core import (
+    create_docx, create_pdf, create_evidence_list_formatted, find_best_court, detect_scenario,
+    calculate_legal_costs, generate_text, get_document_config, is_money_menu, build_document_prompt,
+    build_document_fields, get_gemini_client
+)
+from gemini_client import AIServiceError, RateLimiter, backoff_delay
+
+DEFAULT_MENU = "전자소송 (지급명령/채권자)"
+DEFAULT_MODEL = "models/gemini-1.5-flash"
+MANIFEST_FIELDS = ["case_id", "status", "document", "court", "scenario", "party_a", "party_b",
+                   "amount", "stamp", "service_fee", "attempts", "elapsed_sec", "chars", "files", "error"]
+
+
+def load_cases(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            cases = [json.loads(line) for line in f if line.strip()]
+        else:
+            cases = list(csv.DictReader(f))
+    for i, case in enumerate(cases, 1):
+        case.setdefault("case_id", str(i))
+        if not case.get("case_id"): case["case_id"] = str(i)
+    return cases
+
+
+def _normalize_evidence(raw):
+    if isinstance(raw, list): return "\n".join(str(v) for v in raw)
+    return re.sub(r"\s*;\s*", "\n", raw or "")
+
+
+def prepare_case(case):
+    menu = case.get("menu") or DEFAULT_MENU
+    config = get_document_config(menu)
+    court = case.get("court") or find_best_court(case.get("address", ""), menu)
+    amt, stamp, svc = calculate_legal_costs(case.get("amount", 0))
+    formatted_ev = create_evidence_list_formatted(_normalize_evidence(case.get("evidence")))
+    facts = case.get("facts", "")
+    prompt = build_document_prompt(menu, config, court, case.get("party_a", ""), case.get("party_b", ""),
+                                   amt, facts, formatted_ev)
+    money = is_money_menu(menu)
+    return {
+        "case_id": str(case["case_id"]), "menu": menu, "config": config, "court": court,
+        "scenario": detect_scenario(facts), "amount": amt, "stamp": stamp, "service_fee": svc,
+        "is_money": money, "party_a": case.get("party_a", ""), "party_b": case.get("party_b", ""),
+        "prompt": prompt,
+        "fields": build_document_fields(config, court, case.get("party_a", ""), case.get("party_b", ""), amt,
+                                        formatted_ev, stamp if money else 0, svc if money else 0)
+    }
+
+
+def generate_with_retry(generate, limiter, retries, backoff, *args):
+    attempt = 0
+    while True:
+        attempt += 1
+        if limiter: limiter.acquire()
+        try:
+            return generate(*args), attempt
+        except Exception as e:
+            # AIServiceError 는 클라이언트가 이미 재시도한 결과 (재시도 불가 오류이거나 재시도 소진)
+            if attempt > retries or isinstance(e, AIServiceError):
+                # 실제 호출 횟수: 앞선 시도 + 마지막 시도에서 클라이언트가 보낸 요청 수
+                e.attempts_made = attempt - 1 + getattr(e, "attempts", 1)
+                raise
+            time.sleep(backoff_delay(attempt, backoff))
+
+
+def _safe_name(text):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(text)).strip("_") or "case"
+
+
+def _process(job, generate, limiter, api_key, model, retries, backoff, use_cache):
+    started = time.perf_counter()
+    try:
+        text, attempts = generate_with_retry(generate, limiter, retries, backoff,
+                                             api_key, model, job["prompt"], None, None, use_cache)
+        return job, text, attempts, None, time.perf_counter() - started
+    except Exception as e:
+        return job, None, getattr(e, "attempts_made", 1), f"{type(e).__name__}: {e}", time.perf_counter() - started
+
+
+def run_batch(cases, out, api_key, model=DEFAULT_MODEL, workers=4, rpm=60, retries=3, backoff=2.0,
+              formats=("docx", "pdf"), use_cache=True, generate=None, progress=None):
+    """사건 목록을 처리해 out(경로 또는 파일 객체)에 zip을 씁니다. 매니페스트 행 목록을 반환합니다."""
+    if generate is None:
+        # 실제 호출은 공용 클라이언트가 제한 → 한도를 배치 설정으로 맞추고 별도 제한기는 두지 않음
+        get_gemini_client().configure(max_concurrency=workers, per_minute=rpm)
+        generate, limiter = generate_text, None
+    else:
+        limiter = RateLimiter(rpm)  # 주입한 생성 함수(테스트/스텁)는 클라이언트를 거치지 않음
+    jobs = [prepare_case(c) for c in cases]
+    manifest = []
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_process, job, generate, limiter, api_key, model, retries, backoff, use_cache)
+                   for job in jobs]
+        # zip 쓰기는 메인 스레드에서만 (ZipFile은 스레드 안전하지 않음)
+        for done, fut in enumerate(as_completed(futures), 1):
+            job, text, attempts, error, elapsed = fut.result()
+            title = job["config"]["type"]
+            files = []
+            if text is not None:
+                base = f"{_safe_name(job['case_id'])}_{_safe_name(job['party_a'])}_{title}"
+                try:
+                    # 파일은 모두 만든 뒤에 zip 에 씀 (한 형식만 실패해도 반쪽 결과를 남기지 않도록)
+                    rendered = []
+                    if "docx" in formats: rendered.append((f"{base}.docx", create_docx(title, text, job["fields"])))
+                    if "pdf" in formats: rendered.append((f"{base}.pdf", create_pdf(title, text, job["fields"])))
+                    for name, buf in rendered:
+                        zf.writestr(name, buf.getvalue()); files.append(name)
+                except Exception as e:
+                    # 이미 비용을 낸 AI 결과가 있으므로 배치 전체를 멈추지 않고 이 사건만 실패로 기록
+                    error = f"render: {type(e).__name__}: {e}"
+            ok = text is not None and error is None
+            manifest.append({
+                "case_id": job["case_id"], "status": "ok" if ok else "failed", "document": title,
+                "court": job["court"], "scenario": job["scenario"], "party_a": job["party_a"],
+                "party_b": job["party_b"], "amount": job["amount"], "stamp": job["stamp"] if job["is_money"] else 0,
+                "service_fee": job["service_fee"] if job["is_money"] else 0, "attempts": attempts,
+                "elapsed_sec": round(elapsed, 3), "chars": len(text or ""), "files": ";".join(files),
+                "error": error or ""
+            })
+            if progress: progress(done, len(jobs), manifest[-1])
+
+        manifest.sort(key=lambda r: [int(p) if p.isdigit() else p for p in re.split(r"(\d+)", r["case_id"])])
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=MANIFEST_FIELDS)
+        writer.writeheader(); writer.writerows(manifest)
+        zf.writestr("manifest.csv", "\ufeff" + buf.getvalue())  # 엑셀 호환 BOM
+        ok = [r for r in manifest if r["status"] == "ok"]
+        summary = {
+            "model": model, "total": len(manifest), "succeeded": len(ok), "failed": len(manifest) - len(ok),
+            "total_amount": sum(r["amount"] for r in ok), "total_stamp": sum(r["stamp"] for r in ok),
+            "total_service_fee": sum(r["service_fee"] for r in ok)
+        }
+        zf.writestr("summary.json", json.dumps(summary, ensure_ascii=False, indent=2))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI 법률 마스터 - 지급명령 등 서류 대량 생성")
+    parser.add_argument("cases", help="사건 목록 (.csv 또는 .jsonl)")
+    parser.add_argument("-o", "--out", default="filings.zip", help="결과 zip 경로")
+    parser.add_argument("--api-key", default=os.environ.get("GOOGLE_API_KEY", ""), help="기본값: $GOOGLE_API_KEY")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--workers", type=int, default=4, help="동시 AI 호출 수")
+    parser.add_argument("--rpm", type=float, default=60, help="분당 최대 AI 호출 수")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--formats", default="docx,pdf", help="docx,pdf 중 선택 (쉼표 구분)")
+    parser.add_argument("--no-cache", action="store_true", help="응답 캐시를 사용하지 않음")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("API 키가 필요합니다 (--api-key 또는 GOOGLE_API_KEY)")
+    cases = load_cases(args.cases)
+
+    def progress(done, total, row):
+        print(f"[{done}/{total}] {row['case_id']} {row['status']} ({row['elapsed_sec']}s) {row['error']}", file=sys.stderr)
+
+    manifest = run_batch(cases, args.out, args.api_key, args.model, args.workers, args.rpm, args.retries,
+                         formats=tuple(f.strip() for f in args.formats.split(",") if f.strip()),
+                         use_cache=not args.no_cache, progress=progress)
+    failed = sum(1 for r in manifest if r["status"] != "ok")
+    print(f"완료: {len(manifest) - failed}건 성공 / {failed}건 실패 → {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
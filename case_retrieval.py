@@ -0,0 +1,152 @@
+# -------------------------------------------------------------------------
+# 사건 기록 검색 인덱스 (업로드 PDF 전체를 근거 자료로 활용)
+# - 추출 텍스트를 문단 단위 청크로 나누고, 한글 2-gram 기반 BM25 역색인을 구성
+# - 파일 다이제스트 기준으로 메모리(LRU) + 디스크(.cache/retrieval)에 보관 → 재업로드/리런 시 재구축 없음
+# - 질문/사건 경위와 관련 있는 상위 k개 문단을 토큰 예산 안에서 프롬프트에 삽입
+# -------------------------------------------------------------------------
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+
+INDEX_DIR = os.path.join(".cache", "retrieval")
+INDEX_VERSION = 1
+INDEX_MEM_ENTRIES = 16
+CHUNK_CHARS = 600       # 청크 최대 길이
+CHUNK_OVERLAP = 100     # 긴 문단을 자를 때 겹치는 길이
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-z]+|\d+")
+_mem = OrderedDict()
+_mem_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    # 대략적인 토큰 수 추정 (한글 약 1.5자/토큰, 그 외 약 4자/토큰)
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    return int(hangul / 1.5 + (len(text) - hangul) / 4) + 1
+
+
+def tokenize(text):
+    # 한글은 조사/어미 변화에 강한 글자 2-gram, 영문/숫자는 단어 단위
+    terms = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        if "가" <= tok[0] <= "힣" and len(tok) > 1:
+            terms.extend(tok[i:i + 2] for i in range(len(tok) - 1))
+        else:
+            terms.append(tok)
+    return terms
+
+
+def chunk_text(text, size=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    chunks, cur = [], ""
+    for para in (p.strip() for p in text.split("\n")):
+        if not para: continue
+        if len(para) > size:
+            if cur: chunks.append(cur); cur = ""
+            step = size - overlap
+            chunks.extend(para[i:i + size] for i in range(0, max(1, len(para) - overlap), step))
+            continue
+        if cur and len(cur) + 1 + len(para) > size:
+            chunks.append(cur); cur = ""
+        cur = f"{cur}\n{para}" if cur else para
+    if cur: chunks.append(cur)
+    return chunks
+
+
+class CaseIndex:
+    def __init__(self, digest, chunks, postings=None, lengths=None):
+        self.digest = digest
+        self.chunks = chunks
+        if postings is None:
+            postings, lengths = defaultdict(list), []
+            for cid, chunk in enumerate(chunks):
+                tf = Counter(tokenize(chunk))
+                lengths.append(sum(tf.values()))
+                for term, n in tf.items(): postings[term].append((cid, n))
+            postings = dict(postings)
+        self.postings = postings
+        self.lengths = lengths
+        self.avg_len = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    def search(self, query, k=5):
+        n_docs = len(self.chunks)
+        if not n_docs: return []
+        scores = defaultdict(float)
+        for term, qtf in Counter(tokenize(query)).items():
+            plist = self.postings.get(term)
+            if not plist: continue
+            idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+            for cid, tf in plist:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[cid] / self.avg_len)
+                scores[cid] += qtf * idf * tf * (BM25_K1 + 1) / norm
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:k]
+
+    def retrieve(self, query, k=5, token_budget=800):
+        """관련 문단을 점수 순으로 토큰 예산 안에서 고르고, 원문 순서대로 반환합니다."""
+        picked, used = [], 0
+        for cid, _ in self.search(query, k):
+            cost = estimate_tokens(self.chunks[cid])
+            if used + cost > token_budget: continue
+            picked.append(cid); used += cost
+        return [self.chunks[cid] for cid in sorted(picked)]
+
+    def to_json(self):
+        return {"version": INDEX_VERSION, "digest": self.digest, "chunks": self.chunks,
+                "lengths": self.lengths, "postings": self.postings}
+
+    @classmethod
+    def from_json(cls, data):
+        postings = {t: [tuple(p) for p in plist] for t, plist in data["postings"].items()}
+        return cls(data["digest"], data["chunks"], postings, data["lengths"])
+
+
+def _index_path(digest, index_dir):
+    return os.path.join(index_dir, f"{digest}.json")
+
+
+def _remember(index):
+    with _mem_lock:
+        _mem[index.digest] = index
+        _mem.move_to_end(index.digest)
+        while len(_mem) > INDEX_MEM_ENTRIES: _mem.popitem(last=False)
+
+
+def load_index(digest, index_dir=INDEX_DIR):
+    with _mem_lock:
+        if digest in _mem:
+            _mem.move_to_end(digest)
+            return _mem[digest]
+    try:
+        with open(_index_path(digest, index_dir), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION: return None
+        index = CaseIndex.from_json(data)
+    except (OSError, ValueError, KeyError):
+        return None
+    _remember(index)
+    return index
+
+
+def build_index(digest, text, index_dir=INDEX_DIR):
+    index = load_index(digest, index_dir)
+    if index is not None: return index
+    index = CaseIndex(digest, chunk_text(text))
+    try:
+        os.makedirs(index_dir, exist_ok=True)
+        tmp = _index_path(digest, index_dir) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index.to_json(), f, ensure_ascii=False)
+        os.replace(tmp, _index_path(digest, index_dir))
+    except OSError:
+        pass  # 디스크에 쓸 수 없으면 메모리에만 보관
+    _remember(index)
+    return index
+
+
+def format_context(passages, header="[사건 기록 발췌]"):
+    if not passages: return ""
+    return header + "\n" + "\n---\n".join(passages)
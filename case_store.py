@@ -0,0 +1,249 @@
+# -------------------------------------------------------------------------
+# 사건 저장소 (로컬 SQLite, WAL 모드)
+# - 사건별 입력값/대화/생성 서면을 필드 단위 행으로 저장 → 바뀐 필드만 다시 기록 (자동 저장)
+# - 사용자(owner)별 여러 사건을 만들고 목록/전환은 사건 테이블만 조회
+# - 큰 필드(대화 기록, 생성 서면, 녹취록)는 전환 시 읽지 않고 해당 화면이 처음 쓸 때 로드
+# - 사건 상세 경위/생성 서면/녹취록은 FTS5 전문 검색 (trigram: 조사가 붙은 한국어도 부분 일치, 2글자 이하는 LIKE)
+# - JSON 내보내기는 요청 시 DB 에 저장된 JSON 을 필드별로 이어 붙여 스트리밍 (재직렬화 없음)
+# - 예전 "데이터 백업" JSON 파일은 새 사건으로 가져오기
+# - PDF 사건 기록 색인은 case_index(다이제스트)만 저장 → 색인 본체는 .cache/retrieval 에서 재사용
+#
+# - 화면(app16.py)은 로그인 계정 또는 브라우저(주소의 owner 토큰)별로 사건을 나눔, 새 사건 행은 첫 자동 저장 때 생성
+#
+# 환경 변수: LEGAL_CASE_DB=경로 (기본 .cache/cases.sqlite3),
+#            LEGAL_CASE_OWNER=사용자 (설정하면 모든 세션이 이 사용자의 사건을 공유 → 혼자 쓰는 PC 실행용)
+# -------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+CASE_STORE_PATH = os.environ.get("LEGAL_CASE_DB", os.path.join(".cache", "cases.sqlite3"))
+SHARED_OWNER = os.environ.get("LEGAL_CASE_OWNER") or None
+DEFAULT_OWNER = SHARED_OWNER or "local"     # 배치/스크립트에서 owner 를 생략했을 때
+CASE_FIELDS = ["party_a", "party_b", "amt_in", "facts_raw", "rec_court", "ev_raw", "ref_case", "case_index",
+               "chat_summary", "chat_history", "generated_docs", "audio_transcript"]   # 새 필드는 끝에 추가
+LAZY_FIELDS = {"chat_history", "generated_docs", "audio_transcript"}
+SEARCH_FIELDS = {"facts_raw", "generated_docs", "audio_transcript"}
+_SEARCH_SLOTS = 16              # 검색 행 rowid = 사건 id × 16 + CASE_FIELDS 순번 (UNINDEXED 컬럼 스캔 없이 교체/삭제)
+_FIELD_TYPES = {"chat_summary": dict, "chat_history": list, "generated_docs": dict, "audio_transcript": (dict, type(None))}
+EXPORT_FORMAT = "legal-case/1"
+SEARCH_LIMIT = 20
+EXPORT_SPOOL_BYTES = 1 << 20    # 내보내기 파일이 이보다 크면 임시 파일로 넘김
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY, owner TEXT NOT NULL, title TEXT NOT NULL,
+    created_at REAL NOT NULL, updated_at REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_cases_owner ON cases(owner, updated_at);
+CREATE TABLE IF NOT EXISTS case_fields (
+    case_id INTEGER NOT NULL REFERENCES cases(id) ON DELETE CASCADE, name TEXT NOT NULL,
+    value TEXT NOT NULL, digest TEXT NOT NULL, size INTEGER NOT NULL, updated_at REAL NOT NULL,
+    PRIMARY KEY (case_id, name));
+"""
+
+
+def _digest(raw):
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _changed_fields(values, digests):
+    # [(이름, 값, JSON, 다이제스트)] - 마지막 저장 다이제스트와 다른 필드만
+    changed = []
+    for name, value in values.items():
+        raw = json.dumps(value, ensure_ascii=False)
+        digest = _digest(raw)
+        if digests.get(name) != digest: changed.append((name, value, raw, digest))
+    return changed
+
+
+def _check_field(name, value):
+    # 가져온 파일의 필드 형식 검사 (화면/검색 색인이 기대하는 자료형)
+    expected = _FIELD_TYPES.get(name, str)
+    if not isinstance(value, expected): raise ValueError(f"사건 파일의 {name} 형식이 올바르지 않습니다.")
+    if name == "generated_docs" and not all(isinstance(d, dict) for d in value.values()):
+        raise ValueError("사건 파일의 generated_docs 형식이 올바르지 않습니다.")
+
+
+def _search_rowid(case_id, name):
+    return case_id * _SEARCH_SLOTS + CASE_FIELDS.index(name)
+
+
+def _search_text(name, value):
+    if name == "generated_docs":
+        return "\n\n".join(f"{d.get('title', '')}\n{d.get('content', '')}" for d in value.values())
+    if name == "audio_transcript" and isinstance(value, dict):
+        return "\n".join(e.get("text", "") for e in value.get("entries", ()))
+    return value if isinstance(value, str) else ""
+
+
+class CaseStore:
+    def __init__(self, path=CASE_STORE_PATH):
+        self._lock = threading.Lock()
+        self.persistent = True
+        try:
+            if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = self._open(path)
+        except (OSError, sqlite3.Error):
+            # 디스크를 쓸 수 없는 환경에서는 프로세스 수명 동안만 유지
+            self.persistent = False
+            self._db = self._open(":memory:")
+        self.fts = self._init_search()
+
+    @staticmethod
+    def _open(path):
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA foreign_keys=ON")
+        db.executescript(_SCHEMA)
+        db.commit()
+        return db
+
+    def _init_search(self):
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS case_search USING fts5("
+                                 f"body, case_id UNINDEXED, name UNINDEXED, tokenize='{tokenizer}')")
+                self._db.commit()
+                return tokenizer
+            except sqlite3.Error:
+                continue
+        return None  # FTS5 가 없는 SQLite 빌드: LIKE 검색으로 대체
+
+    # ---- 사건 목록 --------------------------------------------------------
+    def list_cases(self, owner=DEFAULT_OWNER):
+        with self._lock:
+            rows = self._db.execute("SELECT id, title, updated_at FROM cases WHERE owner=? ORDER BY updated_at DESC",
+                                    (owner,)).fetchall()
+        return [{"id": r[0], "title": r[1], "updated_at": r[2]} for r in rows]
+
+    def create_case(self, owner=DEFAULT_OWNER, title="새 사건", values=None):
+        # 사건 행과 첫 필드는 한 트랜잭션으로 기록 (필드 기록이 실패하면 빈 사건 행도 남지 않음)
+        changed = _changed_fields(values or {}, {})
+        now = time.time()
+        with self._lock:
+            with self._db:
+                case_id = self._db.execute("INSERT INTO cases (owner, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                                           (owner, title, now, now)).lastrowid
+                self._write_fields(case_id, changed, now)
+        return case_id
+
+    def rename_case(self, case_id, title):
+        with self._lock:
+            self._db.execute("UPDATE cases SET title=? WHERE id=?", (title, case_id))
+            self._db.commit()
+
+    def delete_case(self, case_id):
+        with self._lock:
+            if self.fts:
+                self._db.execute("DELETE FROM case_search WHERE rowid BETWEEN ? AND ?",
+                                 (case_id * _SEARCH_SLOTS, case_id * _SEARCH_SLOTS + _SEARCH_SLOTS - 1))
+            self._db.execute("DELETE FROM cases WHERE id=?", (case_id,))
+            self._db.commit()
+
+    # ---- 필드 읽기/쓰기 ----------------------------------------------------
+    def load_fields(self, case_id, names=None):
+        """필드 값 dict. names 를 주지 않으면 큰 필드(LAZY_FIELDS)를 제외한 전부."""
+        names = [n for n in CASE_FIELDS if n not in LAZY_FIELDS] if names is None else list(names)
+        marks = ",".join("?" * len(names))
+        with self._lock:
+            rows = self._db.execute(f"SELECT name, value FROM case_fields WHERE case_id=? AND name IN ({marks})",
+                                    (case_id, *names)).fetchall()
+        return {name: json.loads(value) for name, value in rows}
+
+    def load_field(self, case_id, name, default=None):
+        return self.load_fields(case_id, [name]).get(name, default)
+
+    def field_digests(self, case_id):
+        # 자동 저장의 비교 기준 (값은 읽지 않음)
+        with self._lock:
+            return dict(self._db.execute("SELECT name, digest FROM case_fields WHERE case_id=?", (case_id,)))
+
+    def save_fields(self, case_id, values, digests):
+        """digests(필드 -> 마지막 저장 다이제스트)와 다른 필드만 기록하고, 기록한 필드 이름을 반환합니다."""
+        changed = _changed_fields(values, digests)
+        if not changed: return []
+        now = time.time()
+        with self._lock:
+            with self._db:
+                self._write_fields(case_id, changed, now)
+                self._db.execute("UPDATE cases SET updated_at=? WHERE id=?", (now, case_id))
+        for name, _, _, digest in changed: digests[name] = digest
+        return [c[0] for c in changed]
+
+    def _write_fields(self, case_id, changed, now):
+        # 호출자가 잠금과 트랜잭션을 잡은 상태에서 사용
+        for name, value, raw, digest in changed:
+            self._db.execute("INSERT OR REPLACE INTO case_fields VALUES (?, ?, ?, ?, ?, ?)",
+                             (case_id, name, raw, digest, len(raw), now))
+            if name in SEARCH_FIELDS and self.fts:
+                rowid = _search_rowid(case_id, name)
+                self._db.execute("DELETE FROM case_search WHERE rowid=?", (rowid,))
+                self._db.execute("INSERT INTO case_search (rowid, body, case_id, name) VALUES (?, ?, ?, ?)",
+                                 (rowid, _search_text(name, value), case_id, name))
+
+    # ---- 검색 -------------------------------------------------------------
+    def search(self, query, owner=DEFAULT_OWNER, limit=SEARCH_LIMIT):
+        """사건 상세 경위/생성 서면 전문 검색 → [{"id", "title", "field", "snippet"}] (관련도 순)."""
+        query = (query or "").strip()
+        if not query: return []
+        with self._lock:
+            if self.fts and (self.fts != "trigram" or len(query) >= 3):
+                phrase = '"' + query.replace('"', '""') + '"'
+                rows = self._db.execute(
+                    "SELECT s.case_id, c.title, s.name, snippet(case_search, 0, '[', ']', '…', 12) "
+                    "FROM case_search s JOIN cases c ON c.id = s.case_id "
+                    "WHERE case_search MATCH ? AND c.owner=? ORDER BY rank LIMIT ?", (phrase, owner, limit)).fetchall()
+            else:
+                like = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                # 짧은 검색어(trigram 미만) / FTS5 없음: 본문 LIKE 검색, 일치 위치 주변을 발췌
+                table, body = ("case_search", "body") if self.fts else ("case_fields", "value")
+                rows = self._db.execute(
+                    f"SELECT s.case_id, c.title, s.name, substr(s.{body}, max(1, instr(s.{body}, ?) - 12), 40) "
+                    f"FROM {table} s JOIN cases c ON c.id = s.case_id "
+                    f"WHERE c.owner=? AND s.name IN ({','.join('?' * len(SEARCH_FIELDS))}) "
+                    f"AND s.{body} LIKE ? ESCAPE '\\' ORDER BY c.updated_at DESC LIMIT ?",
+                    (query, owner, *sorted(SEARCH_FIELDS), like, limit)).fetchall()
+        return [{"id": r[0], "title": r[1], "field": r[2], "snippet": r[3]} for r in rows]
+
+    # ---- 내보내기/가져오기 -------------------------------------------------
+    def iter_export(self, case_id):
+        """사건 JSON 을 조각 단위로 생성 (필드 값은 저장된 JSON 텍스트를 그대로 사용)."""
+        with self._lock:
+            meta = self._db.execute("SELECT title, created_at, updated_at FROM cases WHERE id=?", (case_id,)).fetchone()
+            names = [r[0] for r in self._db.execute("SELECT name FROM case_fields WHERE case_id=? ORDER BY name",
+                                                    (case_id,))]
+        if meta is None: raise KeyError(case_id)
+        yield json.dumps({"format": EXPORT_FORMAT, "title": meta[0], "created_at": meta[1],
+                          "updated_at": meta[2]}, ensure_ascii=False)[:-1] + ', "fields": {'
+        for i, name in enumerate(names):
+            # 필드 하나씩 읽어 큰 대화 기록도 한 번에 한 필드만 메모리에 올림
+            with self._lock:
+                row = self._db.execute("SELECT value FROM case_fields WHERE case_id=? AND name=?",
+                                       (case_id, name)).fetchone()
+            if row is None: continue
+            yield ("" if i == 0 else ", ") + json.dumps(name) + ": " + row[0]
+        yield "}}"
+
+    def export_file(self, case_id):
+        """다운로드용 파일 객체 (작으면 메모리, 크면 임시 파일)."""
+        out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        for chunk in self.iter_export(case_id): out.write(chunk.encode("utf-8"))
+        out.seek(0)
+        return out
+
+    def import_json(self, fileobj, owner=DEFAULT_OWNER, title=None):
+        """내보내기 파일 또는 예전 백업 파일(필드 평면 dict)을 새 사건으로 가져와 id 를 반환합니다."""
+        data = json.load(fileobj)
+        if not isinstance(data, dict): raise ValueError("사건 파일 형식이 아닙니다.")
+        fields = data.get("fields") if data.get("format") == EXPORT_FORMAT else data
+        if not isinstance(fields, dict): raise ValueError("사건 파일 형식이 아닙니다.")
+        values = {k: v for k, v in fields.items() if k in CASE_FIELDS}
+        if not values: raise ValueError("가져올 사건 정보가 없습니다.")
+        for name, value in values.items(): _check_field(name, value)
+        title = title or data.get("title") or f"{values.get('party_a', '')} v. {values.get('party_b', '')}".strip()
+        return self.create_case(owner, title or "가져온 사건", values)
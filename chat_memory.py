@@ -0,0 +1,86 @@
+# -------------------------------------------------------------------------
+# 챗봇 대화 관리 (토큰 예산 기반 문맥 창 + 누적 요약)
+# - 메시지마다 토큰 수를 한 번만 추정해 저장 → 문맥 계산은 최근 메시지만 훑음
+# - 문맥 창 밖으로 밀려난 오래된 대화는 AI로 요약해 한 단락으로 유지
+# - 요약이 끝난 오래된 메시지는 보관 한도를 넘으면 버려 세션 메모리를 제한
+#
+# 상태는 Streamlit 세션에 그대로 넣을 수 있는 list/dict 로만 구성:
+#   history: [{"role": "user"|"assistant", "content": str, "tokens": int}, ...]
+#   summary: {"text": str, "tokens": int, "upto": int}   # upto = 요약에 반영된 앞쪽 메시지 수
+# -------------------------------------------------------------------------
+from case_retrieval import estimate_tokens
+
+CONTEXT_TOKEN_BUDGET = 2000     # 요약 + 최근 대화에 쓸 토큰 예산
+SUMMARY_TRIGGER_TOKENS = 1200   # 창 밖 미요약 대화가 이만큼 쌓이면 요약 갱신
+MAX_STORED_MESSAGES = 100       # 세션에 보관할 최대 메시지 수 (요약된 것부터 제거)
+PAGE_SIZE = 20                  # 화면에 한 번에 보여줄 메시지 수
+
+ROLE_LABELS = {"user": "사용자", "assistant": "AI"}
+
+
+def new_summary():
+    return {"text": "", "tokens": 0, "upto": 0}
+
+
+def make_message(role, content):
+    return {"role": role, "content": content, "tokens": estimate_tokens(content)}
+
+
+def message_tokens(msg):
+    # 백업 파일에서 불러온 예전 메시지에는 tokens가 없을 수 있음
+    if "tokens" not in msg: msg["tokens"] = estimate_tokens(msg.get("content", ""))
+    return msg["tokens"]
+
+
+def window_start(history, summary, budget=CONTEXT_TOKEN_BUDGET):
+    """예산 안에 들어가는 최근 메시지의 시작 인덱스."""
+    start, used = len(history), summary["tokens"]
+    while start > summary["upto"]:
+        cost = message_tokens(history[start - 1])
+        if used + cost > budget: break
+        start -= 1; used += cost
+    return start
+
+
+def _format_turns(messages):
+    return "\n".join(f"{ROLE_LABELS.get(m['role'], m['role'])}: {m['content']}" for m in messages)
+
+
+def build_chat_prompt(history, summary, user_input, context="", budget=CONTEXT_TOKEN_BUDGET):
+    """history에는 이번 질문이 아직 들어 있지 않아야 합니다."""
+    start = window_start(history, summary, budget - estimate_tokens(user_input))
+    parts = ["너는 한국 법률 전문가야. 판례와 법령에 근거하여 상세히 답변해줘."]
+    if summary["text"]: parts.append(f"[이전 상담 요약]\n{summary['text']}")
+    if start < len(history): parts.append(f"[최근 대화]\n{_format_turns(history[start:])}")
+    if context: parts.append(context)
+    parts.append(f"질문: {user_input}")
+    return "\n\n".join(parts)
+
+
+def update_summary(history, summary, summarize, budget=CONTEXT_TOKEN_BUDGET):
+    """문맥 창 밖의 미요약 대화가 충분히 쌓이면 summarize(prompt) -> str 로 요약을 갱신합니다."""
+    start = window_start(history, summary, budget)
+    pending = history[summary["upto"]:start]
+    if sum(message_tokens(m) for m in pending) < SUMMARY_TRIGGER_TOKENS: return False
+    prompt = ("다음은 법률 상담 대화입니다. 사실관계, 금액, 날짜, 당사자, 이미 안내한 법적 조치를 빠짐없이 "
+              "10문장 이내로 요약해줘.\n\n"
+              + (f"[기존 요약]\n{summary['text']}\n\n" if summary["text"] else "")
+              + f"[추가 대화]\n{_format_turns(pending)}")
+    text = summarize(prompt)
+    if not text or text.startswith("❌"): return False
+    summary.update(text=text.strip(), tokens=estimate_tokens(text), upto=start)
+    return True
+
+
+def compact(history, summary, max_messages=MAX_STORED_MESSAGES):
+    """요약에 반영된 오래된 메시지부터 제거해 보관 한도를 지킵니다 (history를 제자리에서 수정)."""
+    drop = min(summary["upto"], len(history) - max_messages)
+    if drop <= 0: return 0
+    del history[:drop]
+    summary["upto"] -= drop
+    return drop
+
+
+def visible_slice(history, pages=1, page_size=PAGE_SIZE):
+    """화면에 보일 꼬리 부분의 시작 인덱스 (pages 만큼 이전 대화를 펼침)."""
+    return max(0, len(history) - pages * page_size)
@@ -0,0 +1,127 @@
+# -------------------------------------------------------------------------
+# 소송비용 / 지연손해금 일괄 계산 엔진 (NumPy)
+# - calculate_legal_costs / calculate_interest(legal_core.py)의 배열 버전
+# - 수만 건의 채권을 한 번에 계산, 단일 이율 + 실제일수/365 조건에서는 스칼라 함수와 결과가 동일
+# - 법정이율 변경 구간(예: 소송촉진법 20% → 15% → 12%)과 연도별 일수 분할(365/366) 지원
+# -------------------------------------------------------------------------
+import numpy as np
+
+from legal_core import STAMP_TIERS, STAMP_MIN, SERVICE_FEE, parse_amount
+
+# 소송촉진 등에 관한 특례법 법정이율 (시행일, 연이율 %)
+LITIGATION_DELAY_RATES = [("2003-06-01", 20.0), ("2015-10-01", 15.0), ("2019-06-01", 12.0)]
+CIVIL_RATE = 5.0        # 민법 법정이율
+COMMERCIAL_RATE = 6.0   # 상법 법정이율
+
+DAY_COUNTS = ("act/365", "act/act")
+
+
+def to_amounts(values):
+    # 숫자 배열은 그대로, 문자열("30,000,000" 등)은 스칼라 함수와 같은 규칙으로 파싱
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu": return arr.astype(np.int64)
+    if arr.dtype.kind == "f": return np.trunc(arr).astype(np.int64)
+    return np.fromiter((parse_amount(v) for v in arr.ravel()), dtype=np.int64, count=arr.size).reshape(arr.shape)
+
+
+def to_dates(values):
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def batch_legal_costs(amounts):
+    """인지대/송달료 일괄 계산. 반환: (amount, stamp, service_fee) int64 배열."""
+    amt = to_amounts(amounts)
+    valid = amt > 0
+    amt_f = amt.astype(np.float64)
+
+    # 구간 선택: 상한이 낮은 구간부터 조건을 쌓아 np.select 한 번으로 처리
+    conds, choices = [], []
+    for limit, rate, base in STAMP_TIERS:
+        conds.append(np.ones(amt.shape, dtype=bool) if limit is None else amt <= limit)
+        choices.append(amt_f * rate + base)
+    stamp = np.select(conds, choices)
+    stamp = np.maximum(STAMP_MIN, (np.floor_divide(stamp, 100) * 100).astype(np.int64))
+
+    zero = np.zeros(amt.shape, dtype=np.int64)
+    return (np.where(valid, amt, zero), np.where(valid, stamp, zero),
+            np.where(valid, np.int64(SERVICE_FEE), zero))
+
+
+class RateSchedule:
+    """시행일별 연이율 표. rate_on(dates)로 각 날짜의 이율을 구합니다."""
+
+    def __init__(self, entries):
+        entries = sorted((np.datetime64(d, "D"), float(r)) for d, r in entries)
+        self.starts = np.array([d for d, _ in entries], dtype="datetime64[D]")
+        self.rates = np.array([r for _, r in entries], dtype=np.float64)
+
+    def rate_on(self, dates):
+        idx = np.searchsorted(self.starts, to_dates(dates), side="right") - 1
+        # 첫 시행일 이전은 첫 이율을 적용
+        return self.rates[np.clip(idx, 0, len(self.rates) - 1)]
+
+
+LITIGATION_DELAY_SCHEDULE = RateSchedule(LITIGATION_DELAY_RATES)
+
+
+def _year_starts(lo, hi):
+    first = lo.astype("datetime64[Y]")
+    last = hi.astype("datetime64[Y]") + 1
+    return np.arange(first, last + 1).astype("datetime64[D]")
+
+
+def batch_interest(principals, start_dates, end_dates, rates=None, schedule=None, day_count="act/365"):
+    """지연손해금 일괄 계산 (원 미만 버림). 기간이 0일 이하인 채권은 0원.
+
+    - rates: 채권별 연이율(%) 배열 또는 단일 값
+    - schedule: RateSchedule (지정하면 기간을 이율 변경일 기준으로 나눠 합산)
+    - day_count: "act/365" (실제일수/365) 또는 "act/act" (연도별 365/366 분할)
+    """
+    if day_count not in DAY_COUNTS: raise ValueError(f"지원하지 않는 일수 계산 방식: {day_count}")
+    if rates is None and schedule is None: raise ValueError("rates 또는 schedule 중 하나가 필요합니다")
+    p = to_amounts(principals).astype(np.float64)
+    start, end = to_dates(start_dates), to_dates(end_dates)
+    days = (end - start).astype(np.int64)
+    positive = days > 0
+
+    if schedule is None and day_count == "act/365":
+        # 스칼라 calculate_interest와 같은 연산 순서 → 같은 결과
+        r = np.broadcast_to(np.asarray(rates, dtype=np.float64), p.shape)
+        interest = p * (r / 100) * (days / 365)
+        return np.where(positive, np.trunc(interest), 0).astype(np.int64)
+
+    if not positive.any(): return np.zeros(p.shape, dtype=np.int64)
+    lo, hi = start[positive].min(), end[positive].max()
+
+    # 구간 경계 = 이율 변경일 ∪ (act/act이면) 1월 1일
+    bounds = [lo, hi]
+    if schedule is not None: bounds.append(schedule.starts[(schedule.starts > lo) & (schedule.starts < hi)])
+    if day_count == "act/act": bounds.append(_year_starts(lo, hi))
+    bounds = np.unique(np.concatenate([np.atleast_1d(b) for b in bounds]))
+    seg_lo, seg_hi = bounds[:-1], bounds[1:]
+
+    seg_rate = (schedule.rate_on(seg_lo)[None, :] if schedule is not None
+                else np.asarray(rates, dtype=np.float64).reshape(-1, 1) * np.ones((1, len(seg_lo))))
+    if day_count == "act/act":
+        y = seg_lo.astype("datetime64[Y]")
+        seg_denom = ((y + 1).astype("datetime64[D]") - y.astype("datetime64[D]")).astype(np.float64)
+    else:
+        seg_denom = np.full(len(seg_lo), 365.0)
+
+    # (채권 수 × 구간 수) 겹치는 일수 — 구간 수는 보통 수십 개 이하
+    overlap = (np.minimum(end[:, None], seg_hi[None, :]) - np.maximum(start[:, None], seg_lo[None, :]))
+    overlap = np.clip(overlap.astype(np.int64), 0, None)
+    interest = (p[:, None] * (np.broadcast_to(seg_rate, overlap.shape) / 100) * (overlap / seg_denom)).sum(axis=1)
+    return np.where(positive, np.trunc(interest), 0).astype(np.int64)
+
+
+def price_claims(amounts, start_dates, end_dates, rates=None, schedule=None, day_count="act/365"):
+    """채권 포트폴리오 일괄 산정: 인지대, 송달료, 지연손해금, 합계."""
+    amt, stamp, svc = batch_legal_costs(amounts)
+    interest = batch_interest(amt, start_dates, end_dates, rates, schedule, day_count)
+    return {
+        "amount": amt, "stamp": stamp, "service_fee": svc, "interest": interest,
+        "total_claim": amt + interest,
+        "totals": {"amount": int(amt.sum()), "stamp": int(stamp.sum()), "service_fee": int(svc.sum()),
+                   "interest": int(interest.sum())}
+    }
@@ -0,0 +1,54 @@
+# -------------------------------------------------------------------------
+# 서면 줄 판별 (PDF 출력 pdf_export / Word 출력 docx_export 공용)
+# - 항목 제목(청구취지 등), 마크다운 제목, 번호 문단, 갑 제N호증, 날짜/서명/법원 귀중을 구분
+# - 표준 라이브러리만 사용 → Word 내보내기가 reportlab 을 불러오지 않도록 별도 모듈로 둠
+# -------------------------------------------------------------------------
+import re
+
+SECTION_HEADINGS = {"청구취지", "청구원인", "신청취지", "신청이유", "신청원인", "입증방법", "증거방법",
+                    "첨부서류", "부속서류", "사실관계", "결론", "이유", "요지", "고소취지", "범죄사실", "고소사실",
+                    "고소이유", "독촉절차비용", "소명방법", "증거자료"}
+HEADING_MAX_CHARS = 30      # 항목 제목으로 볼 수 있는 최대 길이 (꾸밈 문자 포함)
+_MD_HEADING = re.compile(r"^#{1,6}\s+")
+_BOLD_LINE = re.compile(r"^\*\*(.+?)\*\*\s*:?$")
+_INLINE_MD = re.compile(r"\*\*|__|`")
+_HEADING_KEY = re.compile(r"[\s:：\[\]【】<>()]|^(?:[IVX]+|\d+)\.")
+_EVIDENCE = re.compile(r"^(?:\d+\.\s*)?[갑을병]\s*제?\s*\d+(?:-\d+)?\s*호증\s*")
+_NUMBERED = re.compile(r"^(\d{1,2}\.|[가-하]\.|\d{1,2}\)|[가-하]\)|\(\d{1,2}\)|\([가-하]\)|[①-⑳]|[-•*·])\s+")
+_DATE = re.compile(r"^\d{4}\s*\.\s*\d{1,2}\s*\.\s*\d{1,2}\s*\.?$")
+_SIGN = re.compile(r"\((?:인|서명|날인|서명 또는 날인)\)\s*$")
+
+
+def _item_level(label):
+    if label[0].isdigit() and label.endswith("."): return 0
+    if label.endswith("."): return 1                       # 가.
+    if label[0] in "-•*·": return 1
+    if label.startswith("(") and "가" <= label[1] <= "힣": return 3
+    if label.endswith(")") and "가" <= label[0] <= "힣": return 3
+    return 2                                               # 1) (1) ①
+
+
+def classify_line(line):
+    """서면 한 줄의 종류를 판별합니다. 반환: (종류, 라벨, 본문, 들여쓰기 단계)
+
+    종류: section(청구취지 등) / heading / court(○○법원 귀중) / date / sign / item(번호 문단, 증거) / para
+    """
+    stripped = line.strip()
+    md = _MD_HEADING.match(stripped)
+    bold = _BOLD_LINE.match(stripped)
+    plain = stripped[md.end():] if md else stripped
+    if "*" in plain or "_" in plain or "`" in plain: plain = _INLINE_MD.sub("", plain)
+    plain = plain.strip()
+    key = _HEADING_KEY.sub("", plain) if len(plain) <= HEADING_MAX_CHARS else ""   # 긴 문장은 항목 제목이 아님
+    if key in SECTION_HEADINGS: return "section", "", " ".join(key), 0
+    if plain.endswith("귀중"): return "court", "", plain, 0
+    if _DATE.match(plain): return "date", "", plain, 0
+    if _SIGN.search(plain): return "sign", "", plain, 0
+    if md or bold: return "heading", "", plain.rstrip(":"), 0
+    m = _EVIDENCE.match(plain)
+    if m: return "item", m.group(0).rstrip() + " ", plain[m.end():], 1
+    m = _NUMBERED.match(plain)
+    if m:
+        label = "•" if m.group(1) in "-*·" else m.group(1)
+        return "item", label + " ", plain[m.end():], _item_level(label)
+    return "para", "", plain, min((len(line) - len(line.lstrip())) // 2, 3)
@@ -0,0 +1,593 @@
+# -------------------------------------------------------------------------
+# Word(DOCX) 서면 출력 엔진 (legal_core.create_docx 대체)
+# - 서면 종류(config['type'])별 양식: 지급명령신청서 / 소장 / 고소장 / 개시신청서 (그 밖의 제목은 일반 서면)
+#   → 당사자·법원·금액·증거 칸은 입력값으로, 청구취지/청구원인 등 항목은 AI 답변의 같은 항목으로 채움
+#   (답변에 없는 항목은 양식의 기본 문구, 입력값이 없으면 그 항목을 생략)
+# - 양식은 처음 쓸 때 한 번만 해석(컴파일)해 고정 XML 조각 + 채울 칸 목록으로 보관
+# - 스타일(글꼴/크기/줄 간격/내어쓰기)/글꼴 표/쪽 번호 바닥글/A4 여백은 기본 패키지로 한 번만 만들고
+#   미리 압축해 둔 바이트를 그대로 재사용 → 문서마다 본문(document.xml)과 제목(core.xml)만 압축
+# - 줄 판별(항목 제목, 번호 문단, 갑 제N호증, 날짜/서명/법원 귀중)은 PDF 출력과 공용 (doc_lines.classify_line)
+# - 번호는 Word 자동 번호 대신 본문에 적힌 라벨을 그대로 쓰고 내어쓰기 스타일로 정렬 (이중 번호 방지)
+# - python-docx 없이 표준 라이브러리만 사용 (python-docx 는 --bench 의 기존 방식 비교에만 사용)
+#
+# 사용 예:
+#   python docx_export.py draft.txt -o draft.docx --title 소장 --fields case.json
+#   python docx_export.py --bench --docs 500          # 건/초 (기존 python-docx 방식과 비교)
+#   LEGAL_DOCX_FONT="맑은 고딕" python docx_export.py --bench
+# -------------------------------------------------------------------------
+import argparse
+import datetime
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from doc_lines import classify_line
+
+DOCX_FONT = os.environ.get("LEGAL_DOCX_FONT", "바탕")
+COMPRESS_LEVEL = 6
+CREATOR = "AI 법률 마스터"
+
+# 답변에서 같은 뜻으로 쓰이는 항목 제목 → 양식의 항목 제목
+SECTION_ALIASES = {"신청취지": "청구취지", "신청원인": "청구원인", "신청이유": "청구원인",
+                   "증거방법": "입증방법", "소명방법": "입증방법", "증거자료": "입증방법",
+                   "부속서류": "첨부서류", "고소사실": "범죄사실"}
+DEFAULT_ROLES = {"지급명령신청서": ("채권자", "채무자"), "소장": ("원고", "피고"),
+                 "고소장": ("고소인", "피고소인"), "개시신청서": ("신청인", "채권자목록")}
+
+# 양식 문법: 첫 줄 = 제목, "라벨\t값" = 당사자 칸, "## 제목" = 항목 (아래 줄은 답변에 그 항목이 없을 때의 기본 문구),
+#           {rest} = 양식에 없는 답변 항목 자리 (이후는 날짜/서명/법원 등 맺음), {이름} = 입력값
+TEMPLATES = {
+    "지급명령신청서": """지급명령신청서
+{role}\t{party_a}
+{opp}\t{party_b}
+청구금액\t금 {amount}원
+## 청구취지
+1. {opp}는 {role}에게 금 {amount}원 및 이에 대하여 이 사건 지급명령 정본을 송달받은 다음 날부터 다 갚는 날까지 연 12%의 비율로 계산한 돈을 지급하라.
+2. 독촉절차비용은 {opp}가 부담한다.
+라는 지급명령을 구합니다.
+## 청구원인
+## 독촉절차비용
+금 {costs}원 (인지대 {stamp}원, 송달료 {service_fee}원)
+## 입증방법
+{evidence}
+## 첨부서류
+{rest}
+{date}
+위 {role} {party_a} (인)
+{court} 귀중""",
+    "소장": """소장
+{role}\t{party_a}
+{opp}\t{party_b}
+소송목적의 값\t금 {amount}원
+## 청구취지
+1. {opp}는 {role}에게 금 {amount}원 및 이에 대하여 이 사건 소장 부본 송달 다음 날부터 다 갚는 날까지 연 12%의 비율로 계산한 돈을 지급하라.
+2. 소송비용은 {opp}가 부담한다.
+3. 제1항은 가집행할 수 있다.
+라는 판결을 구합니다.
+## 청구원인
+## 입증방법
+{evidence}
+## 첨부서류
+{rest}
+{date}
+위 {role} {party_a} (인)
+{court} 귀중""",
+    "고소장": """고소장
+{role}\t{party_a}
+{opp}\t{party_b}
+## 고소취지
+{role}은 {opp}을 아래와 같은 범죄사실로 고소하오니 철저히 수사하여 엄히 처벌하여 주시기 바랍니다.
+## 범죄사실
+## 고소이유
+## 입증방법
+{evidence}
+{rest}
+{date}
+위 {role} {party_a} (인)
+{court} 귀중""",
+    "개시신청서": """개시신청서
+{role}\t{party_a}
+{opp}\t{party_b}
+## 신청취지
+## 신청원인
+## 입증방법
+{evidence}
+## 첨부서류
+{rest}
+{date}
+위 {role} {party_a} (인)
+{court} 귀중""",
+}
+GENERIC_TEMPLATE = "{title}\n{rest}"
+
+_FIELD = re.compile(r"\{(\w+)\}")
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_LABEL_SEP = re.compile(r"[:：\t]")
+# 당사자 칸으로 보는 "라벨\t값" 의 라벨 (역할 이름 + 양식의 고정 라벨) → 탭이 든 일반 문장/표는 본문 그대로
+PARTY_LABELS = frozenset({r for pair in DEFAULT_ROLES.values() for r in pair}
+                         | {line.split("\t")[0] for source in TEMPLATES.values() for line in source.split("\n")
+                            if "\t" in line and not _FIELD.search(line.split("\t")[0])})
+
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+R_NS = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+DOC_HEAD = f'{XML_DECL}<w:document {W_NS} {R_NS}><w:body>'
+# A4, 여백은 PDF 출력과 같게 (왼쪽 25mm, 오른쪽 20mm, 위 25mm, 아래 20mm)
+DOC_TAIL = ('<w:sectPr><w:footerReference w:type="default" r:id="rId4"/><w:pgSz w:w="11906" w:h="16838"/>'
+            '<w:pgMar w:top="1417" w:right="1134" w:bottom="1134" w:left="1417" w:header="851" w:footer="567" '
+            'w:gutter="0"/></w:sectPr></w:body></w:document>')
+
+
+# ---- 기본 패키지 (스타일/글꼴/바닥글) ------------------------------------
+def _style(style_id, name, ppr="", rpr="", based="Normal"):
+    return (f'<w:style w:type="paragraph" w:customStyle="1" w:styleId="{style_id}"><w:name w:val="{name}"/>'
+            f'<w:basedOn w:val="{based}"/><w:qFormat/><w:pPr>{ppr}</w:pPr><w:rPr>{rpr}</w:rPr></w:style>')
+
+
+def _styles_xml(font):
+    indent = 360                              # 들여쓰기 한 단계 (12pt 기준 1.5글자, PDF 와 같음)
+    hang = 400                                # 번호 라벨 폭
+    styles = [
+        _style("LegalTitle", "Legal Title", '<w:spacing w:after="480"/><w:jc w:val="center"/>',
+               '<w:b/><w:sz w:val="40"/><w:szCs w:val="40"/>'),
+        _style("LegalSection", "Legal Section", '<w:keepNext/><w:spacing w:before="240" w:after="120"/><w:jc w:val="center"/>',
+               '<w:b/><w:sz w:val="26"/><w:szCs w:val="26"/>'),
+        _style("LegalHeading", "Legal Heading", '<w:keepNext/>', '<w:b/><w:sz w:val="26"/><w:szCs w:val="26"/>'),
+        _style("LegalParty", "Legal Party", '<w:tabs><w:tab w:val="left" w:pos="1800"/></w:tabs>'
+               '<w:ind w:left="1800" w:hanging="1800"/><w:jc w:val="left"/>'),
+        _style("LegalEvidence", "Legal Evidence", f'<w:ind w:left="{indent + 1440}" w:hanging="1440"/><w:jc w:val="left"/>'),
+        _style("LegalDate", "Legal Date", '<w:spacing w:before="480"/><w:jc w:val="center"/>'),
+        _style("LegalSign", "Legal Sign", '<w:jc w:val="right"/>'),
+        _style("LegalCourt", "Legal Court", '<w:spacing w:before="480"/><w:jc w:val="center"/>',
+               '<w:b/><w:sz w:val="30"/><w:szCs w:val="30"/>'),
+    ]
+    for level in range(4):
+        styles.append(_style(f"LegalItem{level}", f"Legal Item {level}",
+                             f'<w:ind w:left="{level * indent + hang}" w:hanging="{hang}"/>'))
+        if level: styles.append(_style(f"LegalIndent{level}", f"Legal Indent {level}", f'<w:ind w:left="{level * indent}"/>'))
+    return (f'{XML_DECL}<w:styles {W_NS}><w:docDefaults><w:rPrDefault><w:rPr>'
+            f'<w:rFonts w:ascii="{font}" w:hAnsi="{font}" w:eastAsia="{font}" w:cs="{font}"/>'
+            '<w:sz w:val="24"/><w:szCs w:val="24"/><w:lang w:val="ko-KR" w:eastAsia="ko-KR"/></w:rPr></w:rPrDefault>'
+            '<w:pPrDefault><w:pPr><w:spacing w:after="0" w:line="408" w:lineRule="auto"/>'   # 줄 간격 1.7배
+            '<w:jc w:val="both"/></w:pPr></w:pPrDefault></w:docDefaults>'
+            '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>'
+            '<w:style w:type="paragraph" w:styleId="Footer"><w:name w:val="footer"/><w:basedOn w:val="Normal"/>'
+            '<w:pPr><w:jc w:val="center"/></w:pPr><w:rPr><w:sz w:val="18"/><w:szCs w:val="18"/></w:rPr></w:style>'
+            + "".join(styles) + '</w:styles>')
+
+
+def _base_parts(font):
+    rel = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    ct = "application/vnd.openxmlformats-officedocument.wordprocessingml"
+    return [
+        ("[Content_Types].xml",
+         f'{XML_DECL}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+         '<Default Extension="xml" ContentType="application/xml"/>'
+         f'<Override PartName="/word/document.xml" ContentType="{ct}.document.main+xml"/>'
+         f'<Override PartName="/word/styles.xml" ContentType="{ct}.styles+xml"/>'
+         f'<Override PartName="/word/settings.xml" ContentType="{ct}.settings+xml"/>'
+         f'<Override PartName="/word/fontTable.xml" ContentType="{ct}.fontTable+xml"/>'
+         f'<Override PartName="/word/footer1.xml" ContentType="{ct}.footer+xml"/>'
+         '<Override PartName="/docProps/core.xml" ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+         '<Override PartName="/docProps/app.xml" '
+         'ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/></Types>'),
+        ("_rels/.rels",
+         f'{XML_DECL}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         f'<Relationship Id="rId1" Type="{rel}/officeDocument" Target="word/document.xml"/>'
+         '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+         'Target="docProps/core.xml"/>'
+         f'<Relationship Id="rId3" Type="{rel}/extended-properties" Target="docProps/app.xml"/></Relationships>'),
+        ("word/_rels/document.xml.rels",
+         f'{XML_DECL}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         f'<Relationship Id="rId1" Type="{rel}/styles" Target="styles.xml"/>'
+         f'<Relationship Id="rId2" Type="{rel}/settings" Target="settings.xml"/>'
+         f'<Relationship Id="rId3" Type="{rel}/fontTable" Target="fontTable.xml"/>'
+         f'<Relationship Id="rId4" Type="{rel}/footer" Target="footer1.xml"/></Relationships>'),
+        ("word/styles.xml", _styles_xml(font)),
+        ("word/settings.xml",
+         f'{XML_DECL}<w:settings {W_NS}><w:defaultTabStop w:val="800"/>'
+         '<w:characterSpacingControl w:val="compressPunctuation"/><w:compat>'
+         '<w:compatSetting w:name="compatibilityMode" w:uri="http://schemas.microsoft.com/office/word" w:val="15"/>'
+         '</w:compat></w:settings>'),
+        ("word/fontTable.xml",
+         f'{XML_DECL}<w:fonts {W_NS}><w:font w:name="{font}"><w:charset w:val="81"/><w:family w:val="roman"/>'
+         '<w:pitch w:val="variable"/></w:font></w:fonts>'),
+        ("word/footer1.xml",   # 쪽 번호 "- N -"
+         f'{XML_DECL}<w:ftr {W_NS}><w:p><w:pPr><w:pStyle w:val="Footer"/></w:pPr>'
+         '<w:r><w:t xml:space="preserve">- </w:t></w:r><w:fldSimple w:instr=" PAGE "><w:r><w:t>1</w:t></w:r></w:fldSimple>'
+         '<w:r><w:t xml:space="preserve"> -</w:t></w:r></w:p></w:ftr>'),
+        ("docProps/app.xml",
+         f'{XML_DECL}<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+         f'<Application>{CREATOR}</Application></Properties>'),
+    ]
+
+
+def _core_xml(title):
+    return (f'{XML_DECL}<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            f'<dc:title>{_esc(_INVALID_XML.sub("", title))}</dc:title><dc:creator>{CREATOR}</dc:creator></cp:coreProperties>')
+
+
+_DOS_DATE = (1 << 5) | 1     # 1980-01-01 (같은 입력이면 같은 바이트 → 내보내기 캐시/비교에 유리)
+
+
+def _zip_entry(name, data, offset, level):
+    packer = zlib.compressobj(level, zlib.DEFLATED, -15)
+    packed = packer.compress(data) + packer.flush()
+    crc, raw = zlib.crc32(data), name.encode("ascii")
+    local = struct.pack("<IHHHHHIIIHH", 0x04034B50, 20, 0, 8, 0, _DOS_DATE, crc, len(packed), len(data), len(raw), 0)
+    central = struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 20, 20, 0, 8, 0, _DOS_DATE, crc, len(packed), len(data),
+                          len(raw), 0, 0, 0, 0, 0, offset)
+    return local + raw + packed, central + raw
+
+
+class BasePackage:
+    """고정 파트는 한 번만 압축해 로컬 헤더째 보관하고, 문서마다 바뀌는 파트만 압축해 zip 을 조립합니다."""
+
+    def __init__(self, parts, level=COMPRESS_LEVEL):
+        self.level = level
+        head, self.central = [], []
+        offset = 0
+        for name, text in parts:
+            local, central = _zip_entry(name, text.encode("utf-8"), offset, level)
+            head.append(local)
+            self.central.append(central)
+            offset += len(local)
+        self.head = b"".join(head)
+
+    def build(self, parts):
+        out, central, offset = [self.head], list(self.central), len(self.head)
+        for name, text in parts:
+            local, entry = _zip_entry(name, text.encode("utf-8"), offset, self.level)
+            out.append(local)
+            central.append(entry)
+            offset += len(local)
+        directory = b"".join(central)
+        out += [directory, struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(central), len(central), len(directory), offset, 0)]
+        return b"".join(out)
+
+
+# ---- 문단 XML ------------------------------------------------------------
+def _esc(text):
+    # XML 에 쓸 수 없는 제어 문자는 render_docx 에서 문서 단위로 한 번만 제거
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _para(style, text):
+    # 탭은 <w:tab/> 으로 (당사자 칸, 번호 라벨 뒤)
+    runs = "<w:tab/>".join(f'<w:t xml:space="preserve">{_esc(part)}</w:t>' for part in text.split("\t"))
+    style = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{style}<w:r>{runs}</w:r></w:p>"
+
+
+def _title_para(title):
+    t = title.strip()
+    if len(t.replace(" ", "")) <= 4: t = " ".join(t.replace(" ", ""))   # 소장 → 소 장 (PDF 와 같게)
+    return _para("LegalTitle", t)
+
+
+def _line_para(line):
+    """분류된 서면 한 줄 (종류, 라벨, 본문, 단계) → 문단 XML."""
+    kind, label, text, level = line
+    if kind == "party": return _para("LegalParty", text)
+    if kind == "section": return _para("LegalSection", text)
+    if kind == "heading": return _para("LegalHeading", text)
+    if kind == "court": return _para("LegalCourt", text)
+    if kind == "date": return _para("LegalDate", text)
+    if kind == "sign": return _para("LegalSign", text)
+    if kind == "item":
+        style = "LegalEvidence" if "호증" in label else f"LegalItem{min(level, 3)}"
+        return _para(style, f"{label.rstrip()}\t{text}")
+    return _para(f"LegalIndent{min(level, 3)}" if level else None, text)
+
+
+def _classify(raw, labels=PARTY_LABELS):
+    if "\t" in raw.strip():
+        label, _, value = raw.strip().partition("\t")
+        if label.strip() in labels:
+            return "party", "", f"{' '.join(label) if len(label) <= 4 else label}\t{value.strip()}", 0
+    return classify_line(raw)
+
+
+def _classified(raw, labels=PARTY_LABELS):
+    return _classify(raw.rstrip("\r\n"), labels) if raw.strip() else None
+
+
+def _emit(lines, out):
+    """분류된 줄 목록 → 문단. 빈 줄(None)은 문단 사이에서만 하나로 (처음/끝, 항목 제목 바로 뒤는 생략)."""
+    pending, after_heading = False, True
+    for line in lines:
+        if line is None:
+            pending = True
+            continue
+        if pending and not after_heading: out.append("<w:p/>")
+        out.append(_line_para(line))
+        pending, after_heading = False, line[0] == "section"
+
+
+# ---- 양식 컴파일 ---------------------------------------------------------
+class CompiledTemplate:
+    """양식 한 종류. ops: 고정 줄 ("static", XML, 분류된 줄) / 채울 칸 ("line", 원문, 입력값 이름)
+    / ("section", 제목, 제목 XML, 기본 문구) / ("preamble",) 답변 머리말 / ("rest",) 양식에 없는 답변 항목."""
+
+    def __init__(self, source):
+        lines = source.split("\n")
+        self.title = lines[0].strip()
+        self.typed = source is not GENERIC_TEMPLATE
+        self.ops, self.sections = [], set()
+        self.header_labels = set()
+        section = None
+        started = False
+        for raw in lines[1:]:
+            if raw.startswith("## "):
+                if not started: self.ops.append(("preamble",)); started = True
+                key = raw[3:].strip()
+                section = ["section", key, _para("LegalSection", " ".join(key)), []]
+                self.ops.append(section)
+                self.sections.add(key)
+                continue
+            if raw.strip() == "{rest}":
+                if not started: self.ops.append(("preamble",)); started = True
+                self.ops.append(("rest",))
+                section = None
+                continue
+            label = raw.split("\t")[0]
+            if "\t" in raw and not _FIELD.fullmatch(label): self.header_labels.add(label.strip())
+            fields = _FIELD.findall(raw)
+            if fields: piece = ("line", raw, tuple(fields))
+            elif raw.strip():
+                line = _classified(raw)
+                piece = ("static", _line_para(line), line)
+            else: continue
+            (section[3] if section is not None else self.ops).append(piece)
+        self.ops = [tuple(op) if isinstance(op, list) else op for op in self.ops]
+
+    def render(self, content, values):
+        preamble, sections = split_sections(content, drop_closing=self.typed)
+        out = [_title_para(values.get("title") or self.title)]
+        for op in self.ops:
+            if op[0] == "static": out.append(op[1])
+            elif op[0] == "line":
+                _fill(op[1], op[2], values, out)
+            elif op[0] == "section":
+                _, key, heading, defaults = op
+                body = sections.pop(key, None)
+                if body is not None:
+                    if not any(body): continue
+                    out.append(heading)
+                    _emit(body, out)
+                elif self._defaults_ready(defaults, values):
+                    out.append(heading)
+                    for piece in defaults:
+                        if piece[0] == "line": _fill(piece[1], piece[2], values, out)
+                        else: out.append(piece[1])
+            elif op[0] == "preamble":
+                _emit(self._keep_preamble(preamble, values), out)
+            elif op[0] == "rest":
+                for key, body in sections.items():
+                    if key: out.append(_para("LegalSection", " ".join(key)))
+                    _emit(body, out)
+        return "".join(out)
+
+    def lines(self, content, values):
+        """render 와 같은 내용을 분류된 줄(None = 빈 줄)로 생성 (제목 제외) → PDF 출력이 같은 양식을 쓰도록."""
+        preamble, sections = split_sections(content, drop_closing=self.typed)
+        for op in self.ops:
+            if op[0] == "static": yield op[2]
+            elif op[0] == "line": yield from _filled(op[1], op[2], values)
+            elif op[0] == "section":
+                key, defaults = op[1], op[3]
+                body = sections.pop(key, None)
+                if body is not None:
+                    if not any(body): continue
+                    yield _section_line(key)
+                    yield from body
+                elif self._defaults_ready(defaults, values):
+                    yield _section_line(key)
+                    for piece in defaults:
+                        if piece[0] == "line": yield from _filled(piece[1], piece[2], values)
+                        else: yield piece[2]
+            elif op[0] == "preamble":
+                yield from self._keep_preamble(preamble, values)
+            elif op[0] == "rest":
+                for key, body in sections.items():
+                    if key: yield _section_line(key)
+                    yield from body
+
+    @staticmethod
+    def _defaults_ready(defaults, values):
+        # 기본 문구는 채울 칸이 모두 있을 때만 (입력값이 없으면 항목 생략)
+        return bool(defaults) and all(values.get(f) for piece in defaults if piece[0] == "line" for f in piece[2])
+
+    def _keep_preamble(self, preamble, values):
+        # 답변 머리말 중 양식 머리(제목, 당사자, 법원/금액 칸)와 겹치는 줄은 버림
+        if not self.typed: return preamble
+        title = (values.get("title") or self.title).replace(" ", "")
+        labels = self.header_labels | {values.get("role", ""), values.get("opp", ""), "관할법원", "법원", "금액"}
+        labels.discard("")
+        names = {values.get("party_a", "").replace(" ", ""), values.get("party_b", "").replace(" ", "")} - {""}
+        kept = []
+        for line in preamble:
+            if line is not None:
+                plain = line[2].replace(" ", "").replace("\t", "")
+                if plain == title: continue
+                head = _LABEL_SEP.split(line[2], 1)
+                label = head[0].replace(" ", "")
+                if label in labels and (len(head) > 1 or plain[len(label):] in names): continue
+            kept.append(line)
+        return kept
+
+
+def _filled(source, fields, values):
+    # 입력값이 빠진 칸이 있는 줄은 통째로 생략, 여러 줄 값(증거 목록 등)은 줄마다 다시 판별
+    if not all(values.get(f) for f in fields): return []
+    text = _FIELD.sub(lambda m: values[m.group(1)], source)
+    labels = PARTY_LABELS | {values.get("role", ""), values.get("opp", "")}   # 설정의 역할 이름이 기본과 다를 수 있음
+    return [_classified(part, labels) for part in text.split("\n")]
+
+
+def _fill(source, fields, values, out):
+    lines = _filled(source, fields, values)
+    if lines: _emit(lines, out)
+
+
+def _section_line(key):
+    return "section", "", " ".join(key), 0
+
+
+def split_sections(content, drop_closing=True):
+    """AI 답변 → (머리말 줄 목록, {항목 제목: 줄 목록}). 줄은 분류된 튜플 (빈 줄은 None)."""
+    preamble, sections, current = [], {}, None
+    for raw in (content or "").split("\n"):
+        line = _classified(raw)
+        if line is not None:
+            kind = line[0]
+            if kind == "section":
+                key = line[2].replace(" ", "")
+                current = sections.setdefault(SECTION_ALIASES.get(key, key), [])
+                continue
+            if drop_closing and kind in ("date", "sign", "court"): continue   # 맺음은 양식이 씀
+        (preamble if current is None else current).append(line)
+    return preamble, sections
+
+
+_templates = {}
+_package = None
+_lock = threading.Lock()
+
+
+def get_template(title):
+    """서면 종류별 컴파일된 양식 (프로세스당 한 번 해석)."""
+    template = _templates.get(title)
+    if template is None:
+        with _lock:
+            template = _templates.get(title)
+            if template is None:
+                template = _templates[title] = CompiledTemplate(TEMPLATES.get(title, GENERIC_TEMPLATE))
+    return template
+
+
+def get_package():
+    global _package
+    if _package is None:
+        with _lock:
+            if _package is None: _package = BasePackage(_base_parts(DOCX_FONT))
+    return _package
+
+
+def _won(value):
+    return f"{value:,}" if isinstance(value, int) else str(value or "")
+
+
+def _values(title, fields):
+    fields = fields or {}
+    role, opp = DEFAULT_ROLES.get(title, ("", ""))
+    today = datetime.date.today()
+    values = {"title": _INVALID_XML.sub("", title), "role": fields.get("role") or role, "opp": fields.get("opp") or opp,
+              "date": f"{today.year}. {today.month}. {today.day}."}
+    for key, value in fields.items():
+        if key in ("amount", "stamp", "service_fee"): value = _won(value) if value else ""
+        elif key == "evidence" and value == "없음": value = ""
+        if value not in (None, ""): values[key] = _INVALID_XML.sub("", str(value))
+    stamp, service_fee = fields.get("stamp"), fields.get("service_fee")
+    if isinstance(stamp, int) and isinstance(service_fee, int) and stamp + service_fee:
+        values["costs"] = _won(stamp + service_fee)
+    return values
+
+
+def template_lines(title, content, fields=None):
+    """(제목, 분류된 줄 생성기) - Word 와 같은 양식/입력값으로 다른 형식(PDF)을 조판할 때."""
+    values, template = _values(title, fields), get_template(title)
+    return values.get("title") or template.title, template.lines(_INVALID_XML.sub("", content or ""), values)
+
+
+def render_docx(title, content, fields=None):
+    """서면 DOCX 바이트. fields: party_a, party_b, role, opp, court, amount, stamp, service_fee, evidence, date."""
+    body = get_template(title).render(_INVALID_XML.sub("", content or ""), _values(title, fields))
+    return get_package().build([("word/document.xml", DOC_HEAD + body + DOC_TAIL), ("docProps/core.xml", _core_xml(title))])
+
+
+# ---- 벤치마크 ------------------------------------------------------------
+def sample_fields():
+    return {"party_a": "홍길동", "party_b": "김철수", "role": "채권자", "opp": "채무자", "court": "서울중앙지방법원",
+            "amount": 30000000, "stamp": 66500, "service_fee": 52000,
+            "evidence": "갑 제1호증 (차용증)\n갑 제2호증 (이체내역서)\n갑 제3호증 (카카오톡 대화록)"}
+
+
+def _legacy_docx(title, content):
+    # 기존 create_docx (python-docx, 문서마다 기본 양식을 새로 읽고 본문을 한 문단으로)
+    from io import BytesIO
+    from docx import Document
+    doc = Document()
+    doc.add_heading(title, 0)
+    doc.add_paragraph(content)
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def benchmark(docs=200, paragraphs=30, legacy=True):
+    from pdf_export import sample_document
+    text, fields = sample_document(paragraphs), sample_fields()
+    started = time.perf_counter()
+    first = render_docx("지급명령신청서", text, fields)     # 양식 컴파일 + 기본 패키지 (프로세스당 한 번)
+    warmup = time.perf_counter() - started
+    titles = list(TEMPLATES)
+    size = 0
+    started = time.perf_counter()
+    for i in range(docs): size += len(render_docx(titles[i % len(titles)], text, fields))
+    elapsed = time.perf_counter() - started
+    result = {"docs": docs, "seconds": round(elapsed, 3), "docs_per_sec": round(docs / elapsed, 1),
+              "ms_per_doc": round(elapsed / docs * 1000, 2), "first_ms": round(warmup * 1000, 1),
+              "bytes_per_doc": size // docs, "first_bytes": len(first)}
+    if legacy:
+        try:
+            _legacy_docx("지급명령신청서", text)      # python-docx import 는 측정에서 제외
+        except ImportError:
+            return result
+        n = max(1, docs // 10)
+        started = time.perf_counter()
+        for _ in range(n): _legacy_docx("지급명령신청서", text)
+        result["legacy_docs_per_sec"] = round(n / (time.perf_counter() - started), 1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI 법률 마스터 - 서면 DOCX 변환 / 벤치마크")
+    parser.add_argument("input", nargs="?", help="변환할 텍스트 파일 (UTF-8, AI 답변)")
+    parser.add_argument("-o", "--out", help="DOCX 경로 (기본: 입력 파일명.docx)")
+    parser.add_argument("--title", default="법률 서면", help=f"서면 종류 ({', '.join(TEMPLATES)} 또는 임의 제목)")
+    parser.add_argument("--fields", help="당사자/법원/금액/증거 JSON 파일 (party_a, party_b, court, amount, evidence ...)")
+    parser.add_argument("--bench", action="store_true", help="초당 문서 수 측정")
+    parser.add_argument("--docs", type=int, default=200, help="벤치마크 문서 수")
+    parser.add_argument("--paragraphs", type=int, default=30, help="벤치마크 문서당 문단 수")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        r = benchmark(args.docs, args.paragraphs)
+        print(f"첫 문서 (양식 컴파일 + 기본 패키지) {r['first_ms']} ms")
+        print(f"{r['docs']}건 {r['seconds']}초 → {r['docs_per_sec']} 건/초, 건당 {r['ms_per_doc']} ms "
+              f"(문서당 {r['bytes_per_doc'] / 1024:.1f}KB)")
+        if "legacy_docs_per_sec" in r:
+            print(f"기존 python-docx 방식 {r['legacy_docs_per_sec']} 건/초 "
+                  f"(×{r['docs_per_sec'] / r['legacy_docs_per_sec']:.0f})")
+        return 0
+    if not args.input: parser.error("입력 파일 또는 --bench 가 필요합니다")
+    fields = None
+    if args.fields:
+        with open(args.fields, encoding="utf-8") as f: fields = json.load(f)
+    with open(args.input, encoding="utf-8-sig") as f: content = f.read()
+    out = args.out or os.path.splitext(args.input)[0] + ".docx"
+    with open(out, "wb") as f: f.write(render_docx(args.title, content, fields))
+    print(out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
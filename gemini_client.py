@@ -0,0 +1,286 @@
+# -------------------------------------------------------------------------
+# Gemini 호출 계층 (프로세스 공용 비동기 클라이언트)
+# - (API 키, 모델)별 GenerativeModel 을 한 번만 만들어 재사용 → 키별 gRPC 채널(연결)을 계속 씀
+# - 전용 이벤트 루프 스레드에서 generate_content_async 실행 → 모든 Streamlit 세션/배치 스레드가 공유
+# - 프로세스 전체 동시 실행 수(세마포어) + 분당 호출 수(토큰 버킷) 제한으로 할당량 폭주 완화
+# - 429/5xx/타임아웃은 지터가 섞인 지수 백오프로 재시도
+# - 일정 시간 응답이 없으면 같은 요청을 한 번 더 보내고(헤지) 먼저 온 응답을 사용
+# - 실패는 종류(kind)와 재시도 가능 여부가 담긴 AIServiceError 로 전달
+# -------------------------------------------------------------------------
+import asyncio
+import hashlib
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# 기본 한도 (환경 변수로 조정, 실행 중에는 GeminiClient.configure 로 변경)
+MAX_CONCURRENCY = int(os.environ.get("LEGAL_AI_CONCURRENCY", 8))          # 프로세스 전체 동시 요청 수
+REQUESTS_PER_MINUTE = float(os.environ.get("LEGAL_AI_RPM", 60))          # 프로세스 전체 분당 요청 수
+REQUEST_TIMEOUT = 60.0      # 요청 1회 제한 시간 (스트리밍은 청크 사이 간격)
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 20.0
+HEDGE_AFTER = 10.0          # 이 시간(초) 안에 응답이 없으면 헤지 요청 (0이면 사용 안 함)
+MODEL_CACHE_ENTRIES = 32
+
+# genai.configure 는 프로세스 전역 설정 → 설정 직후 키 전용 클라이언트를 만드는 구간을 직렬화
+CONFIGURE_LOCK = threading.Lock()
+
+_STATUS_KINDS = {400: "invalid", 401: "auth", 403: "auth", 404: "not_found", 408: "timeout",
+                 429: "quota", 500: "server", 502: "server", 503: "server", 504: "timeout"}
+RETRYABLE_KINDS = {"quota", "server", "timeout"}
+KIND_MESSAGES = {
+    "quota": "요청 한도를 초과했습니다. 잠시 후 다시 시도해 주세요.",
+    "server": "AI 서버가 일시적으로 응답하지 않습니다.",
+    "timeout": "AI 응답 시간이 초과되었습니다.",
+    "auth": "API 키가 올바르지 않거나 권한이 없습니다.",
+    "invalid": "요청 형식이 올바르지 않습니다.",
+    "not_found": "선택한 모델을 찾을 수 없습니다.",
+    "blocked": "안전 정책에 의해 응답이 차단되었습니다.",
+    "unknown": "알 수 없는 오류가 발생했습니다.",
+}
+
+
+class AIServiceError(Exception):
+    def __init__(self, kind, detail="", status=None, attempts=1):
+        self.kind = kind
+        self.detail = detail
+        self.status = status
+        self.attempts = attempts
+        self.retryable = kind in RETRYABLE_KINDS
+        super().__init__(f"{KIND_MESSAGES[kind]} ({detail})" if detail else KIND_MESSAGES[kind])
+
+    def to_dict(self):
+        return {"kind": self.kind, "status": self.status, "retryable": self.retryable,
+                "attempts": self.attempts, "detail": self.detail}
+
+
+def classify_error(exc):
+    if isinstance(exc, AIServiceError): return exc
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return AIServiceError("timeout", "요청 제한 시간 초과")
+    # google.api_core 예외는 code 에 HTTP 상태 코드를 담고 있음
+    status = getattr(exc, "code", None)
+    status = status if isinstance(status, int) else None
+    kind = _STATUS_KINDS.get(status) or ("server" if status and status >= 500 else None)
+    if kind is None:
+        name = type(exc).__name__
+        kind = "blocked" if name in ("BlockedPromptException", "StopCandidateException") else "unknown"
+    return AIServiceError(kind, f"{type(exc).__name__}: {exc}", status)
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    # 지수 백오프 + 지터 (동시 재시도 몰림 방지)
+    return min(cap, base * (2 ** (attempt - 1))) * (0.5 + random.random())
+
+
+class RateLimiter:
+    """분당 호출 수를 제한하는 토큰 버킷 (스레드 안전, 동기/비동기 공용)."""
+
+    def __init__(self, per_minute, burst=None):
+        self._lock = threading.Lock()
+        self.updated = time.monotonic()
+        self.tokens = 0.0
+        self.set_rate(per_minute, burst)
+        self.tokens = float(self.capacity)
+
+    def set_rate(self, per_minute, burst=None):
+        # 이미 쌓인 토큰은 새 용량 안에서 유지 (한도를 바꿔도 순간적으로 몰리지 않도록)
+        with self._lock:
+            self.rate = per_minute / 60.0
+            self.capacity = burst or max(1, int(per_minute // 10))
+            self.tokens = min(self.tokens, self.capacity)
+
+    def _take(self):
+        # 토큰을 가져가면 0, 아니면 기다려야 할 시간(초)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def try_acquire(self):
+        return self._take() == 0.0
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait: return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._take()
+            if not wait: return
+            await asyncio.sleep(wait)
+
+
+def with_api_key(api_key, build):
+    """genai.configure(api_key) 직후 build(genai_client 모듈)로 키 전용 클라이언트를 만들어 반환합니다."""
+    import google.generativeai as genai
+    from google.generativeai import client as genai_client
+    with CONFIGURE_LOCK:
+        genai.configure(api_key=api_key)
+        return build(genai_client)
+
+
+def _response_text(response):
+    try: return response.text
+    except ValueError as e: raise AIServiceError("blocked", str(e)) from e
+
+
+class GeminiClient:
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, per_minute=REQUESTS_PER_MINUTE, timeout=REQUEST_TIMEOUT,
+                 retries=MAX_RETRIES, backoff=BACKOFF_BASE, hedge_after=HEDGE_AFTER):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.limiter = RateLimiter(per_minute)
+        self.stats = Counter()         # calls / retries / hedges / hedge_wins / errors:<kind>
+        self._models = OrderedDict()   # (키 해시, 모델) -> GenerativeModel (루프 스레드 전용)
+        self._loop = None
+        self._semaphore = None
+        self._loop_lock = threading.Lock()
+
+    def configure(self, max_concurrency=None, per_minute=None, burst=None):
+        """프로세스 공용 한도(동시 요청 수, 분당 요청 수)를 바꿉니다. None 인 항목은 그대로 둡니다."""
+        if per_minute is not None: self.limiter.set_rate(per_minute, burst)
+        if max_concurrency is not None and max_concurrency != self.max_concurrency:
+            with self._loop_lock:
+                self.max_concurrency = max_concurrency
+                # 진행 중인 요청은 기존 세마포어에 반납하고, 이후 요청부터 새 한도 적용
+                if self._loop is not None: self._semaphore = asyncio.Semaphore(max_concurrency)
+        return self
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="gemini-client", daemon=True).start()
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._loop = loop
+        return self._loop
+
+    def _model(self, api_key, model_name):
+        # 비동기 gRPC 채널은 만든 이벤트 루프에 묶이므로 반드시 루프 스레드에서 생성/조회
+        key = (hashlib.sha256(api_key.encode("utf-8")).hexdigest(), model_name)
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            return model
+
+        def build(genai_client):
+            import google.generativeai as genai
+            m = genai.GenerativeModel(model_name)
+            m._async_client = genai_client.get_default_generative_async_client()
+            return m
+        model = self._models[key] = with_api_key(api_key, build)
+        while len(self._models) > MODEL_CACHE_ENTRIES: self._models.popitem(last=False)
+        return model
+
+    async def _attempt(self, api_key, model_name, parts, reserved=False):
+        if not reserved: await self.limiter.acquire_async()
+        async with self._semaphore:
+            model = self._model(api_key, model_name)
+            response = await asyncio.wait_for(
+                model.generate_content_async(parts, request_options={"timeout": self.timeout}), self.timeout)
+            return _response_text(response)
+
+    async def _hedged(self, api_key, model_name, parts):
+        first = asyncio.ensure_future(self._attempt(api_key, model_name, parts))
+        if not self.hedge_after: return await first
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        # 할당량에 여유가 없으면 헤지하지 않음 (폭주 상황을 더 키우지 않도록)
+        if done or not self.limiter.try_acquire(): return await first
+        self.stats["hedges"] += 1
+        second = asyncio.ensure_future(self._attempt(api_key, model_name, parts, reserved=True))
+        pending, error = {first, second}, None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending: other.cancel()
+                    if task is second: self.stats["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+
+    async def generate_async(self, api_key, model_name, parts):
+        attempt = 0
+        while True:
+            attempt += 1
+            self.stats["calls"] += 1
+            try:
+                return await self._hedged(api_key, model_name, parts)
+            except Exception as e:
+                err = classify_error(e)
+                err.attempts = attempt
+                if not err.retryable or attempt > self.retries:
+                    self.stats[f"errors:{err.kind}"] += 1
+                    if err is e: raise
+                    raise err from e
+                self.stats["retries"] += 1
+                await asyncio.sleep(backoff_delay(attempt, self.backoff))
+
+    def generate(self, api_key, model_name, parts):
+        """동기 호출용 (Streamlit 스크립트/배치 워커 스레드에서 사용)."""
+        future = asyncio.run_coroutine_threadsafe(self.generate_async(api_key, model_name, parts), self._ensure_loop())
+        return future.result()
+
+    async def _stream_async(self, api_key, model_name, parts, out):
+        # out: queue.Queue 에 ("chunk", text) / ("done", None) / ("error", AIServiceError) 순서로 전달
+        attempt = 0
+        while True:
+            attempt += 1
+            self.stats["calls"] += 1
+            sent = False
+            try:
+                await self.limiter.acquire_async()
+                async with self._semaphore:
+                    model = self._model(api_key, model_name)
+                    response = await asyncio.wait_for(
+                        model.generate_content_async(parts, stream=True, request_options={"timeout": self.timeout}),
+                        self.timeout)
+                    chunks = response.__aiter__()
+                    while True:
+                        try: chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                        except StopAsyncIteration: break
+                        try: piece = chunk.text
+                        except ValueError: continue  # 안전 필터 등으로 텍스트가 없는 청크
+                        if piece:
+                            sent = True
+                            out.put(("chunk", piece))
+                out.put(("done", None))
+                return
+            except Exception as e:
+                err = classify_error(e)
+                err.attempts = attempt
+                # 이미 일부를 내보냈다면 재시도 시 내용이 중복되므로 그대로 실패 처리
+                if sent or not err.retryable or attempt > self.retries:
+                    self.stats[f"errors:{err.kind}"] += 1
+                    out.put(("error", err))
+                    return
+                self.stats["retries"] += 1
+                await asyncio.sleep(backoff_delay(attempt, self.backoff))
+
+    def stream(self, api_key, model_name, parts):
+        """텍스트 조각을 생성하는 동기 제너레이터. 소비를 중단하면(리런 등) 요청도 취소됩니다."""
+        out = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._stream_async(api_key, model_name, parts, out),
+                                                  self._ensure_loop())
+        try:
+            while True:
+                kind, value = out.get()
+                if kind == "chunk": yield value
+                elif kind == "error": raise value
+                else: return
+        finally:
+            future.cancel()
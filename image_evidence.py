@@ -0,0 +1,113 @@
+# -------------------------------------------------------------------------
+# 이미지 증거 전처리 및 일괄 분석
+# - EXIF 회전 보정 → 모델에 맞는 최대 크기로 축소 → (문서 모드) 흑백 대비 보정 → 재인코딩
+# - 실제 형식에 맞는 MIME 타입으로 전송 (PNG를 JPEG로 표기하던 문제 해결)
+# - 전송할 이미지 바이트가 정확히 같은 증거만 이전 분석 결과를 재사용
+#   (지각 해시 근사 매칭은 차주/금액만 다른 계약서를 같은 증거로 판정해 제거)
+#   캐시는 호출 쪽(세션)이 넘겨주며, 프로세스 공용 캐시는 두지 않음 (다른 사용자의 분석 결과 노출 방지)
+# - 여러 장을 제한된 스레드 풀에서 동시에 분석
+# -------------------------------------------------------------------------
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+MAX_DIMENSION = 1568        # 긴 변 최대 픽셀 (모델 입력 해상도 기준)
+JPEG_QUALITY = 85
+DOC_THRESHOLD = 170         # 문서 모드 이진화 기준 (0~255)
+ANALYSIS_CACHE_ENTRIES = 128   # 세션당
+MAX_WORKERS = 4
+
+
+class PreparedImage:
+    def __init__(self, name, data, mime_type, size, original_bytes):
+        self.name = name
+        self.data = data
+        self.mime_type = mime_type
+        self.size = size                    # (width, height)
+        self.original_bytes = original_bytes
+        self.digest = hashlib.sha256(mime_type.encode("utf-8") + b"\0" + data).hexdigest()
+
+    def as_part(self):
+        # google.generativeai 에 그대로 넘길 수 있는 blob 형식
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+def preprocess_image(file, name=None, max_dim=MAX_DIMENSION, document_mode=False):
+    raw = file if isinstance(file, (bytes, bytearray)) else file.getvalue() if hasattr(file, "getvalue") else file.read()
+    img = ImageOps.exif_transpose(Image.open(BytesIO(raw)))
+    if img.mode in ("RGBA", "LA", "P"):
+        # 투명 배경은 흰색으로 합성 (JPEG는 알파 채널 미지원)
+        img = img.convert("RGBA")
+        bg = Image.new("RGB", img.size, "white"); bg.paste(img, mask=img.split()[-1]); img = bg
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+    img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+
+    buf = BytesIO()
+    if document_mode:
+        # 계약서/문자 캡처: 흑백 + 대비 보정 + 이진화 → PNG가 가장 작고 글자가 선명
+        gray = ImageOps.autocontrast(img.convert("L"), cutoff=1)
+        gray.point(lambda v: 255 if v > DOC_THRESHOLD else 0).convert("1").save(buf, "PNG", optimize=True)
+        mime = "image/png"
+    else:
+        img.save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        mime = "image/jpeg"
+    return PreparedImage(name or getattr(file, "name", "image"), buf.getvalue(), mime, img.size, len(raw))
+
+
+def preprocess_images(files, document_mode=False, workers=MAX_WORKERS):
+    # Pillow의 축소/인코딩은 GIL을 놓으므로 스레드로도 병렬 처리됨
+    if len(files) <= 1: return [preprocess_image(f, document_mode=document_mode) for f in files]
+    with ThreadPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        return list(pool.map(lambda f: preprocess_image(f, document_mode=document_mode), files))
+
+
+class AnalysisCache:
+    """전송 바이트 다이제스트 기준 분석 결과 캐시 (세션 단위로 만들어 사용). 네임스페이스 = (모델, 프롬프트, 모드)."""
+
+    def __init__(self, max_entries=ANALYSIS_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # (namespace, digest) -> result
+        self._lock = threading.Lock()
+
+    def get(self, namespace, digest):
+        with self._lock:
+            result = self._entries.get((namespace, digest))
+            if result is not None: self._entries.move_to_end((namespace, digest))
+            return result
+
+    def put(self, namespace, digest, result):
+        with self._lock:
+            self._entries[(namespace, digest)] = result
+            self._entries.move_to_end((namespace, digest))
+            while len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+
+
+def analyze_images(images, analyze, namespace=(), workers=MAX_WORKERS, cache=None):
+    """PreparedImage 목록을 동시에 분석합니다. analyze(img) -> str. cache=None 이면 이전 결과를 재사용하지 않음.
+
+    반환: [(img, result, reused)] (입력 순서 유지). 같은 묶음 안의 똑같은 이미지는 한 번만 분석합니다.
+    """
+    results = [None] * len(images)
+    pending = {}        # 대표 인덱스 -> 같은 이미지 인덱스 목록
+    first = {}          # digest -> 대표 인덱스
+    for i, img in enumerate(images):
+        hit = cache.get(namespace, img.digest) if cache is not None else None
+        if hit is not None:
+            results[i] = (img, hit, True); continue
+        rep = first.setdefault(img.digest, i)
+        pending.setdefault(rep, []).append(i)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as pool:
+            futures = {rep: pool.submit(analyze, images[rep]) for rep in pending}
+            for rep, fut in futures.items():
+                result = fut.result()
+                if cache is not None and not result.startswith("❌"): cache.put(namespace, images[rep].digest, result)
+                for i in pending[rep]:
+                    results[i] = (images[i], result, i != rep)
+    return results
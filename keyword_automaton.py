@@ -0,0 +1,54 @@
+# -------------------------------------------------------------------------
+# 다중 키워드 매칭 오토마톤 (Aho-Corasick)
+# - 키워드 집합을 한 번만 컴파일해 두고, 본문은 한 번의 순회로 모든 매칭을 찾음
+# - 관할 법원 매칭 등 "여러 키워드 중 무엇이 들어 있나" 류의 반복 스캔을 대체
+# -------------------------------------------------------------------------
+from collections import deque
+
+
+class KeywordAutomaton:
+    def __init__(self, keywords):
+        # 같은 키워드가 여러 번 들어와도 첫 번째 순번을 유지 (결정적 우선순위)
+        self.keywords = list(dict.fromkeys(k for k in keywords if k))
+        self._goto = [{}]      # 노드별 전이 테이블
+        self._fail = [0]
+        self._out = [()]       # 노드에서 끝나는 키워드 인덱스들
+        for idx, kw in enumerate(self.keywords):
+            node = 0
+            for ch in kw:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({}); self._fail.append(0); self._out.append(())
+                node = nxt
+            self._out[node] = self._out[node] + (idx,)
+        self._build_fail_links()
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """(시작 위치, 키워드 인덱스)를 본문 순서대로 생성합니다."""
+        goto, fail, out, kws = self._goto, self._fail, self._out, self.keywords
+        node = 0
+        for pos, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for idx in out[node]:
+                yield pos - len(kws[idx]) + 1, idx
+
+    def found(self, text):
+        """본문에 등장한 키워드 인덱스 집합."""
+        return {idx for _, idx in self.iter_matches(text)}
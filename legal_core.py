@@ -0,0 +1,571 @@
+# -------------------------------------------------------------------------
+# AI 법률 마스터 공용 로직 (app16.py 화면 / batch_filing.py 배치 처리 공용)
+# - Streamlit은 리런마다 app16.py 전체를 다시 실행하지만, 이 모듈은 프로세스당 한 번만 로드됨
+# - 따라서 모델 목록 / 응답 캐시 / 법원 매칭기 등 프로세스 공용 객체는 여기에 둠
+# - google.generativeai / reportlab / pypdf 는 실제로 쓰는 함수 안에서만 import
+#   (콜드 스타트 시간 단축, startup_profile.py 로 측정)
+# -------------------------------------------------------------------------
+import json
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from io import BytesIO
+from case_retrieval import build_index, load_index, format_context, estimate_tokens
+from keyword_automaton import KeywordAutomaton
+from scenario_classifier import ScenarioClassifier, load_scenarios
+from pii_masking import MaskingEngine
+from telemetry import timed, span, record_ai_call  # 마이크로초 단위 조회(find_best_court, calculate_legal_costs)는 계측 제외
+from legal_data import (
+    JURISDICTION_MAP, AMBIGUOUS_REGIONS, SPECIAL_COURT_MAP,
+    MIND_CARE_DB, SCENARIO_LOGIC
+)
+
+_singletons = {}
+_singleton_lock = threading.Lock()
+
+def _singleton(name, factory):
+    with _singleton_lock:
+        if name not in _singletons: _singletons[name] = factory()
+        return _singletons[name]
+
+# -------------------------------------------------------------------------
+# [1. 통합 데이터베이스 → legal_data.py]
+# -------------------------------------------------------------------------
+# JURISDICTION_MAP, SCENARIO_LOGIC 등은 legal_data.py 에 있음 (화면용 COURT_LIST/COURT_INDEX 는 app16.py 가 직접 import)
+
+# -------------------------------------------------------------------------
+# [2. 유틸리티 및 AI 함수 (신기능 + 원본 기능)]
+# -------------------------------------------------------------------------
+
+# [PERF] 모델 목록 캐시 (프로세스 공용, TTL + 백그라운드 갱신)
+# - 리런마다 list_models() 네트워크 호출을 하지 않도록 API 키 해시 단위로 보관
+# - TTL이 지난 항목은 기존 값을 즉시 돌려주고 뒤에서 갱신 (stale-while-revalidate)
+# - 조회 실패는 짧은 TTL로 기억해 두어 실패하는 호출을 매번 기다리지 않음
+MODEL_CATALOG_TTL = 600        # 정상 목록 유지 시간 (초)
+MODEL_CATALOG_FAIL_TTL = 60    # 실패 결과 유지 시간 (초)
+MODEL_CATALOG_COLD_WAIT = 1.5  # 최초 조회 시 최대 대기 시간 (초)
+
+class ModelCatalog:
+    def __init__(self, ttl=MODEL_CATALOG_TTL, fail_ttl=MODEL_CATALOG_FAIL_TTL):
+        self.ttl = ttl
+        self.fail_ttl = fail_ttl
+        self._lock = threading.Lock()
+        self._entries = {}     # key_hash -> (models, fetched_at)
+        self._inflight = {}    # key_hash -> threading.Event
+
+    @staticmethod
+    def key_of(api_key):
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    @timed("gemini.list_models")
+    def _fetch(self, api_key):
+        import google.generativeai as genai
+        from gemini_client import with_api_key
+        client = with_api_key(api_key, lambda genai_client: genai_client.get_default_model_client())
+        return [m.name for m in genai.list_models(client=client) if 'generateContent' in m.supported_generation_methods]
+
+    def _refresh(self, api_key, key, done):
+        try: models = self._fetch(api_key)
+        except Exception: models = []
+        with self._lock:
+            prev = self._entries.get(key)
+            if models or not prev or not prev[0]:
+                self._entries[key] = (models, time.time())
+            self._inflight.pop(key, None)
+        done.set()
+
+    def _is_fresh(self, entry):
+        ttl = self.ttl if entry[0] else self.fail_ttl
+        return time.time() - entry[1] < ttl
+
+    def get(self, api_key, wait=MODEL_CATALOG_COLD_WAIT):
+        if not api_key: return []
+        key = self.key_of(api_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self._is_fresh(entry):
+                return entry[0]
+            done = self._inflight.get(key)
+            if done is None:
+                done = threading.Event()
+                self._inflight[key] = done
+                threading.Thread(target=self._refresh, args=(api_key, key, done), daemon=True).start()
+        # 캐시 값이 있으면 (만료되었더라도) 기다리지 않고 즉시 반환
+        if entry: return entry[0]
+        done.wait(wait)
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry else []
+
+    def invalidate(self, api_key=None):
+        with self._lock:
+            if api_key is None: self._entries.clear()
+            else: self._entries.pop(self.key_of(api_key), None)
+
+def get_model_catalog():
+    return _singleton("model_catalog", ModelCatalog)
+
+@timed("get_available_models")
+def get_available_models(api_key):
+    return get_model_catalog().get(api_key)
+
+# [NEW FEATURE 1] 개인정보 마스킹 (보안)
+# - 단일 정규식으로 미리 컴파일된 마스킹 엔진 (pii_masking.py), 기본: 주민번호/휴대폰/이메일
+MASKING_ENGINE = MaskingEngine()
+
+@timed("mask_sensitive_data")
+def mask_sensitive_data(text):
+    return MASKING_ENGINE.mask(text)
+
+# 마스킹 결과와 탐지기별 건수 (예: {"rrn": 1, "mobile": 2})
+@timed("mask_sensitive_data_with_counts")
+def mask_sensitive_data_with_counts(text):
+    return MASKING_ENGINE.mask_with_counts(text)
+
+# [NEW FEATURE 2] PDF 텍스트 추출 (RAG)
+# - 페이지 단위 지연 추출 + 다이제스트 캐시 (pdf_ingest.py), max_chars만큼 채우면 중단
+PDF_PREVIEW_CHARS = 300
+PDF_APPLY_CHARS = 1500
+
+@timed("extract_text_from_pdf")
+def extract_text_from_pdf(file, max_chars=None):
+    from pdf_ingest import extract_pdf_text
+    try:
+        text, _, _ = extract_pdf_text(file, max_chars=max_chars)
+        return text
+    except Exception as e:
+        return f"PDF 읽기 오류: {str(e)}"
+
+# [NEW] 사건 기록 검색 (RAG) - 업로드 PDF 전체를 색인해 관련 문단만 프롬프트에 삽입
+RETRIEVAL_TOP_K = 5
+RETRIEVAL_TOKEN_BUDGET = 800
+
+_index_jobs = {}   # digest -> 백그라운드 색인 작업 (성공한 작업은 결과를 넘겨준 뒤 제거)
+_index_jobs_lock = threading.Lock()
+
+def _build_case_index(digest, data):
+    from pdf_ingest import extract_pdf_text
+    text, _, _ = extract_pdf_text(data)
+    return build_index(digest, text)
+
+@timed("index_case_pdf")
+def index_case_pdf(file, background=False):
+    """업로드 PDF 의 사건 기록 색인 → (digest, 색인 또는 None).
+
+    저장된 색인(메모리/.cache/retrieval)이 있으면 PDF 를 다시 파싱하지 않음.
+    background=True 면 색인이 없을 때 전용 스레드에서 만들고 None 을 반환 (화면은 프리뷰만 읽고 바로 그려짐,
+    retrieve_case_context 는 색인이 끝난 뒤부터 발췌를 넣음). 실패한 작업의 예외는 다음 호출에서 다시 올림.
+    """
+    from pdf_ingest import read_pdf_bytes, pdf_digest
+    data = read_pdf_bytes(file)
+    digest = pdf_digest(data)
+    index = load_index(digest)
+    if index is not None:
+        if digest in _index_jobs:
+            with _index_jobs_lock: _index_jobs.pop(digest, None)
+        return digest, index
+    if not background: return digest, _build_case_index(digest, data)
+    with _index_jobs_lock:
+        job = _index_jobs.get(digest)
+        if job is None:
+            pool = _singleton("index_pool", lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix="case-index"))
+            job = _index_jobs[digest] = pool.submit(_build_case_index, digest, data)
+    if not job.done(): return digest, None
+    return digest, job.result()   # 실패했으면 예외를 그대로 올림 (성공했다면 위의 load_index 에서 이미 반환됨)
+
+@timed("retrieve_case_context")
+def retrieve_case_context(digest, query, k=RETRIEVAL_TOP_K, token_budget=RETRIEVAL_TOKEN_BUDGET):
+    if not digest or not query: return ""
+    index = load_index(digest)
+    if index is None: return ""
+    return format_context(index.retrieve(query, k, token_budget))
+
+# [NEW FEATURE 3] PDF 결과물 변환 (Export)
+# - 한글 글꼴/글자 폭 기준 줄바꿈/서면 양식 조판은 pdf_export.py 참고 (양식/입력 칸은 create_docx 와 공용)
+@timed("create_pdf")
+def create_pdf(title, content, fields=None):
+    from pdf_export import render_pdf
+    return render_pdf(title, content, fields)
+
+# [복구] 증거 목록 포맷팅 (app14.py 원본 기능)
+@timed("create_evidence_list_formatted")
+def create_evidence_list_formatted(text):
+    if not text: return "없음"
+    evs = [e.strip() for e in text.split('\n') if e.strip()]
+    return "\n".join([f"갑 제{i}호증 ({v})" for i, v in enumerate(evs, 1)])
+
+# [PERF] 관할 법원 매칭기 (프로세스당 한 번 컴파일)
+# - 모든 지명을 한 번의 순회로 찾고, 가장 긴 지명 우선 / 길이가 같으면 JURISDICTION_MAP 순서 우선
+class CourtMatcher:
+    def __init__(self, jurisdiction_map, ambiguous=None, default_court="서울중앙지방법원"):
+        self.default_court = default_court
+        self.ambiguous = ambiguous or {}
+        self.automaton = KeywordAutomaton(jurisdiction_map.keys())
+        self.courts = [jurisdiction_map[k] for k in self.automaton.keywords]
+        # (길이 내림차순, 등록 순서) 우선순위를 미리 계산
+        self.rank = [(-len(k), i) for i, k in enumerate(self.automaton.keywords)]
+
+    def match(self, address):
+        if not address: return self.default_court
+        found = self.automaton.found(address)
+        if not found: return self.default_court
+        best = min(found, key=self.rank.__getitem__)
+        key = self.automaton.keywords[best]
+        for qualifier, court in self.ambiguous.get(key, ()):
+            if qualifier in address: return court
+        return self.courts[best]
+
+def get_court_matcher():
+    return _singleton("court_matcher", lambda: CourtMatcher(JURISDICTION_MAP, AMBIGUOUS_REGIONS))
+
+def _court_category(category):
+    if any(x in category for x in ["가사", "이혼", "상속"]): return "가사"
+    elif any(x in category for x in ["회생", "파산"]): return "회생"
+    elif any(x in category for x in ["행정"]): return "행정"
+    return ""
+
+def _apply_special_court(base_court, cat_key):
+    if cat_key:
+        region_prefix = base_court[:2]
+        if region_prefix in SPECIAL_COURT_MAP.get(cat_key, {}):
+            return SPECIAL_COURT_MAP[cat_key][region_prefix]
+    return base_court
+
+def find_best_court(address, category="일반"):
+    return _apply_special_court(get_court_matcher().match(address), _court_category(category))
+
+# 대량 주소 처리 (CSV 접수 등): 카테고리 판정은 한 번, 같은 주소는 한 번만 매칭
+@timed("find_best_courts")
+def find_best_courts(addresses, category="일반"):
+    matcher, cat_key, seen = get_court_matcher(), _court_category(category), {}
+    results = []
+    for address in addresses:
+        if address not in seen:
+            seen[address] = _apply_special_court(matcher.match(address), cat_key)
+        results.append(seen[address])
+    return results
+
+# [PERF] 사건 유형 분류기 (프로세스당 한 번 컴파일, LEGAL_SCENARIO_CONFIG 설정 파일 반영)
+def get_scenario_classifier():
+    return _singleton("scenario_classifier", lambda: ScenarioClassifier(load_scenarios(base=SCENARIO_LOGIC)))
+
+@timed("detect_scenario")
+def detect_scenario(text):
+    classifier = get_scenario_classifier()
+    return classifier.label(classifier.classify(text))
+
+# 대량 접수 본문 분류 (같은 본문은 한 번만 계산)
+@timed("detect_scenarios")
+def detect_scenarios(texts):
+    classifier = get_scenario_classifier()
+    return [classifier.label(key) for key in classifier.classify_many(texts)]
+
+# 인지대 구간 (상한 금액, 요율, 가산액) / 송달료 (1회 5,200원 × 15회)
+# cost_engine.py의 일괄 계산도 같은 표를 사용
+STAMP_TIERS = [(10000000, 0.005, 0), (100000000, 0.0045, 5000), (None, 0.004, 55000)]
+STAMP_MIN = 1000
+SERVICE_FEE = 5200 * 15
+
+def parse_amount(amount):
+    try: return int(str(amount).replace(",", ""))
+    except: return 0
+
+def calculate_legal_costs(amount):
+    amt = parse_amount(amount)
+    if amt <= 0: return 0, 0, 0
+    
+    for limit, rate, base in STAMP_TIERS:
+        if limit is None or amt <= limit:
+            stamp = amt * rate + base
+            break
+    stamp = max(STAMP_MIN, int(stamp // 100 * 100))
+    svc = SERVICE_FEE
+    return amt, stamp, svc
+
+# 지연손해금 (단리, 실제 일수 / 365)
+@timed("calculate_interest")
+def calculate_interest(principal, start, end, rate):
+    days = (end - start).days
+    if days <= 0: return 0
+    return int(principal * (rate/100) * (days/365))
+
+@timed("predict_detailed_timeline")
+def predict_detailed_timeline(amount):
+    amt = parse_amount(amount)
+    
+    today = date.today()
+    steps = [
+        (0, "소장 접수", "인지대/송달료 납부 및 사건번호 부여", "start"),
+        (4, "부본 송달", "피고에게 소장이 전달되고 답변서를 기다리는 단계", "wait"),
+        (12, "변론 기일", "법정에 출석하여 양측의 주장과 증거를 다투는 단계", "fight"),
+        (20, "재판 심리", "추가 증거 조사 및 판사의 최종 판단 과정", "trial"),
+        (28, "판결 선고", "최종 판결문 교부 및 소송의 종결", "end")
+    ]
+    
+    timeline = []
+    for w, ev, ds, care_key in steps:
+        timeline.append({
+            "week": f"{w}주차",
+            "date": (today + timedelta(weeks=w)).strftime("%Y.%m.%d"),
+            "event": ev, "desc": ds, "care": MIND_CARE_DB[care_key]
+        })
+    return timeline
+
+# [PERF] Word 서면 - 서면 종류별 양식/기본 패키지를 한 번만 만들고 문서마다 본문만 채움 (docx_export.py 참고)
+@timed("create_docx")
+def create_docx(title, content, fields=None):
+    from docx_export import render_docx
+    return BytesIO(render_docx(title, content, fields))
+
+def build_document_fields(config, court, party_a, party_b, amt, formatted_ev, stamp=0, svc=0):
+    """서면 양식의 당사자/법원/금액/증거 칸 (tab1 / 사건 패키지 / 배치 처리 공용)."""
+    return {"role": config['role'], "opp": config['opp'], "court": court, "party_a": party_a, "party_b": party_b,
+            "amount": amt, "evidence": formatted_ev, "stamp": stamp, "service_fee": svc}
+
+# [PERF] AI 응답 캐시 (메모리 LRU + SQLite 디스크 저장소)
+# - 키: 모델명 + 마스킹된 프롬프트 + 첨부파일 다이제스트 (원문 개인정보는 저장하지 않음)
+# - 항목별 TTL, 용량 기준 제거, 호출 단위 우회(use_cache=False) 지원
+RESPONSE_CACHE_PATH = os.path.join(".cache", "responses.sqlite3")
+RESPONSE_CACHE_TTL = 7 * 24 * 3600            # 항목 유지 시간 (초)
+RESPONSE_CACHE_MEM_ENTRIES = 256              # 메모리 LRU 최대 항목 수
+RESPONSE_CACHE_DISK_BYTES = 64 * 1024 * 1024  # 디스크 저장소 최대 용량
+
+def content_digest(content, mime_type=None):
+    if content is None: return ""
+    h = hashlib.sha256((mime_type or "").encode("utf-8"))
+    if isinstance(content, (bytes, bytearray)):
+        h.update(content)
+    elif isinstance(content, dict) and "data" in content:
+        h.update(content.get("mime_type", "").encode("utf-8")); h.update(content["data"])
+    elif hasattr(content, "tobytes") and hasattr(content, "size"):  # PIL Image
+        h.update(f"{content.mode}:{content.size}".encode("utf-8")); h.update(content.tobytes())
+    else:
+        h.update(str(content).encode("utf-8"))
+    return h.hexdigest()
+
+class ResponseCache:
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttl=RESPONSE_CACHE_TTL,
+                 mem_entries=RESPONSE_CACHE_MEM_ENTRIES, disk_bytes=RESPONSE_CACHE_DISK_BYTES):
+        self.ttl = ttl
+        self.mem_entries = mem_entries
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()   # key -> (value, expires_at)
+        self._db = None
+        try:
+            if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,
+                expires_at REAL NOT NULL, accessed_at REAL NOT NULL)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+            self._db.commit()
+        except sqlite3.Error:
+            self._db = None  # 디스크를 쓸 수 없는 환경에서는 메모리 캐시만 사용
+
+    @staticmethod
+    def make_key(model_name, safe_prompt, digest=""):
+        raw = json.dumps([model_name, safe_prompt, digest], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, value, expires_at):
+        self._mem[key] = (value, expires_at)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_entries:
+            self._mem.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit:
+                if hit[1] > now:
+                    self._mem.move_to_end(key)
+                    return hit[0]
+                del self._mem[key]
+            if self._db is None: return None
+            try:
+                row = self._db.execute("SELECT value, expires_at FROM responses WHERE key=?", (key,)).fetchone()
+                if not row: return None
+                if row[1] <= now:
+                    self._db.execute("DELETE FROM responses WHERE key=?", (key,)); self._db.commit()
+                    return None
+                self._db.execute("UPDATE responses SET accessed_at=? WHERE key=?", (now, key)); self._db.commit()
+            except sqlite3.Error: return None
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is None: return
+            try:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                                 (key, value, len(value.encode("utf-8")), expires_at, now))
+                self._evict(now)
+                self._db.commit()
+            except sqlite3.Error: pass
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM responses WHERE expires_at<=?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.disk_bytes: return
+        # 오래 사용되지 않은 항목부터 용량 한도 아래로 제거
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key=?", (key,))
+            total -= size
+            if total <= self.disk_bytes: break
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                try: self._db.execute("DELETE FROM responses"); self._db.commit()
+                except sqlite3.Error: pass
+
+def get_response_cache():
+    return _singleton("response_cache", ResponseCache)
+
+# 사건 저장소 (자동 저장/사건 전환/검색) → case_store.py
+def get_case_store():
+    from case_store import CaseStore
+    return _singleton("case_store", CaseStore)
+
+def _prepare_gemini_request(model_name, prompt, content=None, mime_type=None, use_cache=True):
+    safe_prompt = mask_sensitive_data(prompt)
+    parts = [safe_prompt, content] if content and mime_type else safe_prompt
+    cache = get_response_cache() if use_cache else None
+    key = None
+    if cache:
+        key = cache.make_key(model_name, safe_prompt, content_digest(content, mime_type) if content and mime_type else "")
+    return parts, cache, key
+
+# [PERF] 프로세스 공용 Gemini 클라이언트 (모델 재사용, 동시 실행/분당 호출 제한, 재시도, 헤지)
+def get_gemini_client():
+    from gemini_client import GeminiClient  # asyncio 로드 비용이 있어 첫 AI 호출 때 import
+    return _singleton("gemini_client", GeminiClient)
+
+# AI 호출 지표 (모델, 프롬프트 길이, 지연 시간, 추정 토큰 수, 캐시 적중, 오류 종류) → telemetry.py
+def _record_ai(model_name, prompt, text, started, cache_hit, stream=False, first_token=None, error=None):
+    record_ai_call(model_name, len(prompt), time.perf_counter() - started, estimate_tokens(prompt),
+                   estimate_tokens(text) if text else 0, cache_hit, stream, first_token, error)
+
+# 예외(AIServiceError)를 그대로 올리는 생성 함수 (배치 처리의 실패 기록용)
+def generate_text(api_key, model_name, prompt, content=None, mime_type=None, use_cache=True):
+    started, text, hit, error = time.perf_counter(), "", False, None
+    try:
+        parts, cache, key = _prepare_gemini_request(model_name, prompt, content, mime_type, use_cache)
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                text, hit = cached, True
+                return cached
+
+        text = get_gemini_client().generate(api_key, model_name, parts)
+        if cache: cache.put(key, text)
+        return text
+    except Exception as e:
+        error = getattr(e, "kind", type(e).__name__)
+        raise
+    finally:
+        _record_ai(model_name, prompt, text, started, hit, error=error)
+
+def get_gemini_response(api_key, model_name, prompt, content=None, mime_type=None, use_cache=True):
+    try: return generate_text(api_key, model_name, prompt, content, mime_type, use_cache)
+    except Exception as e: return f"❌ AI 서비스 오류: {str(e)}"
+
+# [PERF] 스트리밍 응답 (첫 토큰까지의 대기 시간 단축)
+# - st.write_stream()에 그대로 넘길 수 있는 제너레이터, 완성된 전체 텍스트는 캐시에 저장
+def stream_gemini_response(api_key, model_name, prompt, content=None, mime_type=None, use_cache=True):
+    started, first, chunks, hit, error = time.perf_counter(), None, [], False, None
+    try:
+        parts, cache, key = _prepare_gemini_request(model_name, prompt, content, mime_type, use_cache)
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                hit = True
+                chunks.append(cached)
+                yield cached
+                return
+
+        for piece in get_gemini_client().stream(api_key, model_name, parts):
+            if first is None: first = time.perf_counter() - started
+            chunks.append(piece)
+            yield piece
+        if cache and chunks: cache.put(key, "".join(chunks))
+    except Exception as e:
+        error = getattr(e, "kind", type(e).__name__)
+        yield f"❌ AI 서비스 오류: {str(e)}"
+    finally:
+        # 화면 이동 등으로 중간에 소비가 멈춰도 그때까지의 지표를 남김
+        _record_ai(model_name, prompt, "".join(chunks), started, hit, True, first, error)
+
+# 메뉴별 서류 설정 (tab1 / 배치 처리 공용)
+def get_document_config(menu):
+    config = {"type": "법률 서면", "role": "신청인", "opp": "피신청인"}
+    if "지급명령" in menu: config = {"type": "지급명령신청서", "role": "채권자", "opp": "채무자"}
+    elif "민사소송" in menu: config = {"type": "소장", "role": "원고", "opp": "피고"}
+    elif "형사" in menu: config = {"type": "고소장", "role": "고소인", "opp": "피고소인"}
+    elif "행정" in menu: config = {"type": "소장", "role": "원고", "opp": "피고(처분청)"}
+    elif "파산" in menu: config = {"type": "개시신청서", "role": "신청인", "opp": "채권자목록"}
+    return config
+
+def is_money_menu(menu):
+    return any(x in menu for x in ["민사", "지급", "대여", "손해", "보증금"])
+
+def build_document_prompt(menu, config, court, party_a, party_b, amt, facts, formatted_ev, context=""):
+    prompt = f"""
+            역할: 당신은 {menu} 전문 변호사입니다.
+            문서: {config['type']}
+            관할법원: {court}
+            {config['role']}: {party_a}
+            {config['opp']}: {party_b}
+            금액: {amt}원
+            청구원인: {facts}
+            입증방법: {formatted_ev}
+            
+            요청사항: 법률 서식에 맞춰 엄격하게 작성하세요. 결론과 이유를 명확히 나누세요.
+            """
+    if context: prompt += f"\n{context}\n위 사건 기록 발췌를 근거로 사실관계를 보완하세요.\n"
+    return prompt
+
+# 내용증명 / 판례 검색 프롬프트 (tab2 / tab4 / 사건 패키지 공용)
+def build_notice_prompt(sender, receiver, facts):
+    return f"{sender}가 {receiver}에게 보내는 강력한 내용증명 작성. 내용: {facts}. 민형사상 조치 예고 포함."
+
+def build_precedent_prompt(query, context=""):
+    # [복구] app15의 프롬프트 스타일 반영 (핵심 요약)
+    prompt = f"'{query}'와 관련된 최신 대법원 판례 핵심 요약 및 승소 전략."
+    if context: prompt += f"\n{context}\n위 사건과 유사한 판례를 우선 찾아주세요."
+    return prompt
+
+# [복구] app14의 구체적인 이미지 증거 프롬프트 (별점 평가)
+EVIDENCE_IMAGE_PROMPT = "이 이미지 증거의 민사소송상 법적 효력을 별점(5점만점)으로 평가하고, 핵심 내용을 요약해줘."
+AUDIO_TRANSCRIBE_PROMPT = ("이 녹음 구간을 한국어로 들리는 그대로 받아 적어줘. 요약이나 해설 없이 발화마다 한 줄씩 "
+                           "'[mm:ss] 화자N: 발화' 형식으로 쓰고, 시각은 이 구간의 시작을 00:00 으로 해줘. "
+                           "알아들을 수 없는 부분은 (불명확)으로 표시해줘.")
+
+# [PERF] 여러 AI 작업 동시 실행 (사건 패키지)
+# - 전체 대기 시간 ≈ 가장 느린 작업 하나 (순차 실행 시에는 모든 작업 시간의 합)
+# - 실제 동시 요청 수/분당 호출 수는 공용 Gemini 클라이언트가 프로세스 단위로 제한
+PACKAGE_WORKERS = 4
+
+def run_concurrently(tasks, workers=PACKAGE_WORKERS):
+    """{이름: 인자 없는 함수} 를 동시에 실행하고, 끝나는 순서대로 (이름, 결과, 경과 초)를 생성합니다."""
+    if not tasks: return
+    started = time.perf_counter()
+    # 제너레이터라 데코레이터(@timed)로는 생성 시점만 잡힘 → 마지막 결과를 넘길 때까지를 스팬으로 측정
+    with span("run_concurrently"), ThreadPoolExecutor(max_workers=max(1, min(workers, len(tasks)))) as pool:
+        futures = {pool.submit(fn): name for name, fn in tasks.items()}
+        for fut in as_completed(futures):
+            try: result = fut.result()
+            except Exception as e: result = f"❌ 처리 오류: {str(e)}"
+            yield futures[fut], result, time.perf_counter() - started
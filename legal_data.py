@@ -0,0 +1,149 @@
+# -------------------------------------------------------------------------
+# AI 법률 마스터 정적 데이터 (법원 목록, 관할 매핑, 시나리오 키워드 등)
+# - 프로세스당 한 번만 로드되며, 자주 쓰는 조회용 인덱스도 여기서 미리 계산
+# - 무거운 라이브러리를 import 하지 않으므로 어디서든 부담 없이 가져다 쓸 수 있음
+# -------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------
+# [1. 통합 데이터베이스 (app14 + app15 데이터 완전 복구)]
+# -------------------------------------------------------------------------
+
+# 1-1. 전체 법원 리스트 (app14 원본)
+COURT_LIST = [
+    "서울중앙지방법원", "서울동부지방법원", "서울남부지방법원", "서울북부지방법원", "서울서부지방법원",
+    "서울가정법원", "서울행정법원", "서울회생법원",
+    "의정부지방법원", "의정부지방법원 고양지원", "의정부지방법원 남양주지원",
+    "인천지방법원", "인천지방법원 부천지원", "인천가정법원",
+    "수원지방법원", "수원지방법원 성남지원", "수원지방법원 여주지원", "수원지방법원 평택지원", "수원지방법원 안산지원", "수원지방법원 안양지원", 
+    "수원가정법원", "수원회생법원",
+    "춘천지방법원", "춘천지방법원 강릉지원", "춘천지방법원 원주지원", "춘천지방법원 속초지원", "춘천지방법원 영월지원",
+    "대전지방법원", "대전지방법원 천안지원", "대전지방법원 서산지원", "대전지방법원 홍성지원", "대전지방법원 논산지원", "대전지방법원 공주지원", 
+    "대전가정법원",
+    "청주지방법원", "청주지방법원 충주지원", "청주지방법원 제천지원", "청주지방법원 영동지원",
+    "대구지방법원", "대구지방법원 서부지원", "대구지방법원 포항지원", "대구지방법원 김천지원", "대구지방법원 안동지원", "대구지방법원 경주지원", "대구지방법원 상주지원", "대구지방법원 의성지원", "대구지방법원 영덕지원", 
+    "대구가정법원",
+    "부산지방법원", "부산지방법원 동부지원", "부산지방법원 서부지원", "부산가정법원", "부산회생법원",
+    "울산지방법원", "울산가정법원",
+    "창원지방법원", "창원지방법원 마산지원", "창원지방법원 진주지원", "창원지방법원 통영지원", "창원지방법원 밀양지원", "창원지방법원 거창지원",
+    "광주지방법원", "광주지방법원 순천지원", "광주지방법원 목포지원", "광주지방법원 장흥지원", "광주지방법원 해남지원", "광주가정법원",
+    "전주지방법원", "전주지방법원 군산지원", "전주지방법원 정읍지원", "전주지방법원 남원지원",
+    "제주지방법원"
+]
+
+# 1-2. 상세 관할 구역 매핑 (app14 원본 전체 복구 - 줄바꿈 압축 없이 전체 나열)
+JURISDICTION_MAP = {
+    # 서울
+    "종로": "서울중앙지방법원", "중구": "서울중앙지방법원", "강남": "서울중앙지방법원", "서초": "서울중앙지방법원", 
+    "관악": "서울중앙지방법원", "동작": "서울중앙지방법원",
+    "성동": "서울동부지방법원", "광진": "서울동부지방법원", "강동": "서울동부지방법원", "송파": "서울동부지방법원",
+    "영등포": "서울남부지방법원", "강서": "서울남부지방법원", "양천": "서울남부지방법원", 
+    "구로": "서울남부지방법원", "금천": "서울남부지방법원",
+    "동대문": "서울북부지방법원", "중랑": "서울북부지방법원", "성북": "서울북부지방법원", 
+    "도봉": "서울북부지방법원", "강북": "서울북부지방법원", "노원": "서울북부지방법원",
+    "은평": "서울서부지방법원", "서대문": "서울서부지방법원", "마포": "서울서부지방법원", "용산": "서울서부지방법원",
+    # 경기 북부
+    "고양": "의정부지방법원 고양지원", "파주": "의정부지방법원 고양지원",
+    "남양주": "의정부지방법원 남양주지원", "구리": "의정부지방법원 남양주지원", "가평": "의정부지방법원 남양주지원",
+    "의정부": "의정부지방법원", "양주": "의정부지방법원", "동두천": "의정부지방법원", "포천": "의정부지방법원", 
+    "연천": "의정부지방법원", "철원": "의정부지방법원",
+    # 인천/부천
+    "부천": "인천지방법원 부천지원", "김포": "인천지방법원 부천지원",
+    "인천": "인천지방법원", "강화": "인천지방법원", "옹진": "인천지방법원",
+    # 경기 남부
+    "성남": "수원지방법원 성남지원", "하남": "수원지방법원 성남지원", "광주": "수원지방법원 성남지원",
+    "안산": "수원지방법원 안산지원", "광명": "수원지방법원 안산지원", "시흥": "수원지방법원 안산지원",
+    "안양": "수원지방법원 안양지원", "과천": "수원지방법원 안양지원", "의왕": "수원지방법원 안양지원", "군포": "수원지방법원 안양지원",
+    "평택": "수원지방법원 평택지원", "안성": "수원지방법원 평택지원",
+    "여주": "수원지방법원 여주지원", "이천": "수원지방법원 여주지원", "양평": "수원지방법원 여주지원",
+    "수원": "수원지방법원", "용인": "수원지방법원", "화성": "수원지방법원", "오산": "수원지방법원",
+    # 강원
+    "춘천": "춘천지방법원", "홍천": "춘천지방법원", "양구": "춘천지방법원", "인제": "춘천지방법원", "화천": "춘천지방법원",
+    "강릉": "춘천지방법원 강릉지원", "동해": "춘천지방법원 강릉지원", "삼척": "춘천지방법원 강릉지원",
+    "원주": "춘천지방법원 원주지원", "횡성": "춘천지방법원 원주지원",
+    "속초": "춘천지방법원 속초지원", "양양": "춘천지방법원 속초지원", "고성": "춘천지방법원 속초지원",
+    "영월": "춘천지방법원 영월지원", "태백": "춘천지방법원 영월지원", "정선": "춘천지방법원 영월지원", "평창": "춘천지방법원 영월지원",
+    # 충청
+    "천안": "대전지방법원 천안지원", "아산": "대전지방법원 천안지원",
+    "서산": "대전지방법원 서산지원", "당진": "대전지방법원 서산지원", "태안": "대전지방법원 서산지원",
+    "홍성": "대전지방법원 홍성지원", "보령": "대전지방법원 홍성지원", "예산": "대전지방법원 홍성지원", "서천": "대전지방법원 홍성지원",
+    "논산": "대전지방법원 논산지원", "계룡": "대전지방법원 논산지원", "부여": "대전지방법원 논산지원",
+    "공주": "대전지방법원 공주지원", "청양": "대전지방법원 공주지원",
+    "대전": "대전지방법원", "세종": "대전지방법원", "금산": "대전지방법원",
+    "청주": "청주지방법원", "진천": "청주지방법원", "보은": "청주지방법원", "괴산": "청주지방법원", "증평": "청주지방법원",
+    "충주": "청주지방법원 충주지원", "음성": "청주지방법원 충주지원",
+    "제천": "청주지방법원 제천지원", "단양": "청주지방법원 제천지원",
+    "영동": "청주지방법원 영동지원", "옥천": "청주지방법원 영동지원",
+    # 대구/경북
+    "달서": "대구지방법원 서부지원", "달성": "대구지방법원 서부지원", "대구 서구": "대구지방법원 서부지원", "고령": "대구지방법원 서부지원", "성주": "대구지방법원 서부지원",
+    "대구": "대구지방법원", "수성": "대구지방법원", "경산": "대구지방법원", "청도": "대구지방법원", "칠곡": "대구지방법원",
+    "포항": "대구지방법원 포항지원", "울릉": "대구지방법원 포항지원",
+    "경주": "대구지방법원 경주지원",
+    "김천": "대구지방법원 김천지원", "구미": "대구지방법원 김천지원",
+    "안동": "대구지방법원 안동지원", "영주": "대구지방법원 안동지원", "봉화": "대구지방법원 안동지원",
+    "상주": "대구지방법원 상주지원", "문경": "대구지방법원 상주지원", "예천": "대구지방법원 상주지원",
+    "의성": "대구지방법원 의성지원", "군위": "대구지방법원 의성지원", "청송": "대구지방법원 의성지원",
+    "영덕": "대구지방법원 영덕지원", "울진": "대구지방법원 영덕지원", "영양": "대구지방법원 영덕지원",
+    # 부산/경남
+    "해운대": "부산지방법원 동부지원", "부산남구": "부산지방법원 동부지원", "수영": "부산지방법원 동부지원", "기장": "부산지방법원 동부지원",
+    "사하": "부산지방법원 서부지원", "사상": "부산지방법원 서부지원", "부산강서": "부산지방법원 서부지원", "북구": "부산지방법원 서부지원",
+    "부산": "부산지방법원",
+    "울산": "울산지방법원", "양산": "울산지방법원",
+    "창원": "창원지방법원", "함안": "창원지방법원", "의령": "창원지방법원",
+    "마산": "창원지방법원 마산지원", "진해": "창원지방법원 마산지원", # (행정구역 통합 고려)
+    "진주": "창원지방법원 진주지원", "사천": "창원지방법원 진주지원", "남해": "창원지방법원 진주지원", "하동": "창원지방법원 진주지원", "산청": "창원지방법원 진주지원",
+    "통영": "창원지방법원 통영지원", "거제": "창원지방법원 통영지원", "고성": "창원지방법원 통영지원",
+    "밀양": "창원지방법원 밀양지원", "창녕": "창원지방법원 밀양지원",
+    "거창": "창원지방법원 거창지원", "함양": "창원지방법원 거창지원", "합천": "창원지방법원 거창지원",
+    # 광주/전라
+    "순천": "광주지방법원 순천지원", "여수": "광주지방법원 순천지원", "광양": "광주지방법원 순천지원", "보성": "광주지방법원 순천지원", "고흥": "광주지방법원 순천지원", "구례": "광주지방법원 순천지원",
+    "목포": "광주지방법원 목포지원", "무안": "광주지방법원 목포지원", "신안": "광주지방법원 목포지원", "함평": "광주지방법원 목포지원", "영암": "광주지방법원 목포지원",
+    "해남": "광주지방법원 해남지원", "완도": "광주지방법원 해남지원", "진도": "광주지방법원 해남지원",
+    "장흥": "광주지방법원 장흥지원", "강진": "광주지방법원 장흥지원",
+    "광주": "광주지방법원", "나주": "광주지방법원", "화순": "광주지방법원", "장성": "광주지방법원", "곡성": "광주지방법원", "담양": "광주지방법원", "영광": "광주지방법원",
+    "군산": "전주지방법원 군산지원", "익산": "전주지방법원 군산지원",
+    "정읍": "전주지방법원 정읍지원", "고창": "전주지방법원 정읍지원", "부안": "전주지방법원 정읍지원",
+    "남원": "전주지방법원 남원지원", "순창": "전주지방법원 남원지원", "장수": "전주지방법원 남원지원", "무주": "전주지방법원 남원지원", "임실": "전주지방법원 남원지원",
+    "전주": "전주지방법원", "완주": "전주지방법원", "김제": "전주지방법원", "진안": "전주지방법원",
+    # 제주
+    "제주": "제주지방법원", "서귀포": "제주지방법원"
+}
+
+# 1-2-1. 중복 지명 구분 (예: 경기 광주 ↔ 광주광역시, 강원 고성 ↔ 경남 고성)
+# 주소에 앞쪽 광역 지명이 함께 있으면 해당 법원을, 없으면 JURISDICTION_MAP 값을 사용
+AMBIGUOUS_REGIONS = {
+    "광주": [("경기", "수원지방법원 성남지원")],
+    "고성": [("강원", "춘천지방법원 속초지원")]
+}
+
+# 1-2-2. 특수 법원 로직 (app14 원본)
+SPECIAL_COURT_MAP = {
+    "가사": {"서울": "서울가정법원", "인천": "인천가정법원", "수원": "수원가정법원", "대전": "대전가정법원", "대구": "대구가정법원", "부산": "부산가정법원", "울산": "울산가정법원", "광주": "광주가정법원"},
+    "회생": {"서울": "서울회생법원", "수원": "수원회생법원", "부산": "부산회생법원"},
+    "파산": {"서울": "서울회생법원", "수원": "수원회생법원", "부산": "부산회생법원"},
+    "행정": {"서울": "서울행정법원"}
+}
+
+# 1-3. 마인드 케어 DB (app14 원본 + working links)
+MIND_CARE_DB = {
+    "start": {"advice": "시작이 반입니다. 권리 구제의 첫걸음을 응원합니다. (차분한 재즈)", "video": "https://www.youtube.com/watch?v=lTRiuFIWV54"},
+    "wait": {"advice": "법원은 증거로 말합니다. 차분히 답변서를 기다리며 마음을 다스리세요. (빗소리)", "video": "https://www.youtube.com/watch?v=mPZkdNFkNps"},
+    "fight": {"advice": "감정적 대응은 금물입니다. 냉철한 판단을 위해 집중력이 필요합니다. (집중 클래식)", "video": "https://www.youtube.com/watch?v=77ZozI0rw7w"},
+    "trial": {"advice": "재판장 앞에서는 간결하고 명확해야 합니다. 평정심을 유지하세요. (차분한 피아노)", "video": "https://www.youtube.com/watch?v=beh5h13aL2I"},
+    "end": {"advice": "수고하셨습니다. 결과와 상관없이 당신의 노력은 가치 있습니다. (힐링 풍경)", "video": "https://www.youtube.com/watch?v=ysz5S6PUM-U"}
+}
+
+# 1-4. 시나리오 감지 로직 (app14 원본)
+# - 키워드는 "단어"(가중치 1) 또는 ["단어", 가중치]: 여러 사건에 두루 쓰이는 단어는 가중치를 낮춤
+# - 설정 파일로 유형 추가/변경: scenario_classifier.py 참고
+SCENARIO_LOGIC = {
+    "LOAN": {"label": "💰 대여금 청구", "weights": ["빌려", "대여", "차용", "차용증", "입금", "송금", "이자"]},
+    "DEPOSIT": {"label": "🏠 보증금 반환", "weights": ["보증금", "전세", "월세", "임대차", "집주인", "세입자", "만기"]},
+    "TORT": {"label": "🏥 손해배상", "weights": ["사고", "폭행", "피해", "과실", "치료비", "위자료", "모욕"]},
+    "WAGE": {"label": "💼 임금 청구", "weights": ["임금", "월급", "퇴직금", "급여", "해고"]},
+    "SALES": {"label": "🏗️ 물품/공사대금", "weights": ["물품", "공사", "대금", "자재", "납품"]},
+    "ESTATE": {"label": "🏘️ 부동산 계약", "weights": ["부동산", "매매", ["계약", 0.3], "등기", "소유권"]},
+    "GENERAL": {"label": "📝 일반 민사", "weights": []}
+}
+
+# 1-5. 미리 계산된 조회 인덱스
+COURT_INDEX = {name: i for i, name in enumerate(COURT_LIST)}   # 법원명 -> selectbox 위치
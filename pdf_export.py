@@ -0,0 +1,354 @@
+# -------------------------------------------------------------------------
+# 한글 PDF 서면 출력 엔진 (legal_core.create_pdf 대체)
+# - 한글 TTF(나눔명조/나눔고딕/맑은고딕 등)를 프로세스당 한 번만 찾아 등록
+#   → reportlab 이 실제로 쓴 글자만 부분 임베딩(subset)
+#   TTF가 없으면 reportlab 내장 한글 CID 글꼴(HYSMyeongJo/HYGothic)로 대체
+# - 글자 폭을 실제로 측정해 줄바꿈 (기존: 80자에서 잘라냄 / Helvetica라 한글 깨짐)
+# - 서면 양식: 제목, 청구취지/청구원인 등 항목 제목, 번호 문단 내어쓰기, 갑 제N호증 목록,
+#   날짜/서명/법원 귀중, 쪽 번호
+# - render_pdf 는 Word 출력과 같은 서면 양식(docx_export.TEMPLATES)에 당사자/법원/금액/증거 칸을 채워 조판
+#   (stream_pdf 는 입력 줄을 그대로 조판)
+# - 줄 단위 이터러블(파일, 생성기)을 받아 바로 조판 → 긴 문서도 입력 전체를 메모리에 올리지 않음
+#   (페이지 내용은 압축해서 보관)
+#
+# 사용 예:
+#   python pdf_export.py draft.txt -o draft.pdf --title 소장
+#   python pdf_export.py --bench --docs 200           # 초당 페이지 수
+#   python pdf_export.py --bench --long-pages 500     # 긴 문서 스트리밍 조판 + 메모리 사용량
+#   LEGAL_PDF_FONT=/path/NanumMyeongjo.ttf python pdf_export.py --bench
+# -------------------------------------------------------------------------
+import argparse
+import os
+import sys
+import threading
+import time
+from io import BytesIO, StringIO
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from doc_lines import classify_line  # 줄 판별은 Word 출력(docx_export)과 공용
+from docx_export import template_lines  # 서면 종류별 양식(당사자/법원/금액/증거 칸)도 Word 출력과 공용
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FONT_ENV = "LEGAL_PDF_FONT"
+FONT_DIRS = [os.path.join(HERE, "fonts"), "/usr/share/fonts", "/usr/local/share/fonts",
+             os.path.expanduser("~/.fonts"), "/Library/Fonts", "/System/Library/Fonts/Supplemental",
+             "C:/Windows/Fonts"]
+# (본문, 제목) TTF 후보 - 앞에 있을수록 우선
+FONT_CANDIDATES = [("NanumMyeongjo.ttf", "NanumMyeongjoBold.ttf"), ("NanumGothic.ttf", "NanumGothicBold.ttf"),
+                   ("malgun.ttf", "malgunbd.ttf"), ("NotoSansKR-Regular.ttf", "NotoSansKR-Bold.ttf"),
+                   ("UnBatang.ttf", "UnBatangBold.ttf")]
+CID_FONTS = ("HYSMyeongJo-Medium", "HYGothic-Medium")
+
+PAGE_MARGINS = (25 * mm, 20 * mm, 25 * mm, 20 * mm)   # 왼쪽, 오른쪽, 위, 아래
+BODY_SIZE = 12
+HEADING_SIZE = 13
+TITLE_SIZE = 20
+LEADING = 1.7           # 줄 간격 (글자 크기 배수)
+INDENT = BODY_SIZE * 1.5
+PARTY_TAB = BODY_SIZE * 7   # 당사자 칸 값의 시작 위치 (라벨 왼쪽 기준)
+
+_fonts = None
+_font_lock = threading.Lock()
+_width_tables = {}
+
+
+def _find_font_files():
+    wanted = {name.lower() for pair in FONT_CANDIDATES for name in pair}
+    found = {}
+    for font_dir in FONT_DIRS:
+        if not os.path.isdir(font_dir): continue
+        for root, _, files in os.walk(font_dir):
+            for f in files:
+                if f.lower() in wanted: found.setdefault(f.lower(), os.path.join(root, f))
+    return found
+
+
+def _register_fonts():
+    candidates = [(os.environ[FONT_ENV], None)] if os.environ.get(FONT_ENV) else []
+    found = _find_font_files()
+    candidates += [(found.get(body.lower()), found.get(bold.lower())) for body, bold in FONT_CANDIDATES]
+    for body, bold in candidates:
+        if not body: continue
+        try:
+            pdfmetrics.registerFont(TTFont("LegalBody", body))
+            if bold: pdfmetrics.registerFont(TTFont("LegalBold", bold))
+            return ("LegalBody", "LegalBold" if bold else "LegalBody")
+        except Exception:
+            continue  # reportlab 이 읽지 못하는 형식 (CFF 기반 OTF/TTC 등)
+    for name in CID_FONTS: pdfmetrics.registerFont(UnicodeCIDFont(name))
+    return CID_FONTS
+
+
+def get_fonts():
+    """(본문 글꼴, 제목 글꼴) 이름. 프로세스당 한 번만 찾아 등록합니다."""
+    global _fonts
+    with _font_lock:
+        if _fonts is None: _fonts = _register_fonts()
+        return _fonts
+
+
+class _WidthTable(dict):
+    # 글자별 폭(1000 단위) 캐시 - 같은 글자를 stringWidth 로 반복 측정하지 않음
+    def __init__(self, font):
+        super().__init__()
+        self.font = font
+
+    def __missing__(self, ch):
+        w = self[ch] = pdfmetrics.stringWidth(ch, self.font, 1000)
+        return w
+
+
+def _width_table(font):
+    table = _width_tables.get(font)
+    if table is None: table = _width_tables[font] = _WidthTable(font)
+    return table
+
+
+def text_width(text, font, size):
+    table = _width_table(font)
+    return sum(table[ch] for ch in text) * size / 1000
+
+
+def wrap_text(text, font, size, max_width):
+    """측정한 글자 폭 기준으로 줄을 나눕니다. 띄어쓰기(어절)에서 우선 나누고, 긴 어절은 글자 단위로 나눕니다."""
+    table = _width_table(font)
+    limit = max_width * 1000 / size
+    lines, start, width, space = [], 0, 0.0, -1
+    for i, ch in enumerate(text):
+        w = table[ch]
+        if width + w > limit and i > start:
+            if space > start:
+                lines.append(text[start:space].rstrip())
+                start = space + 1
+                width = sum(table[c] for c in text[start:i])
+            else:
+                lines.append(text[start:i])
+                start, width = i, 0.0
+            space = -1
+        if ch == " ": space = i
+        width += w
+    lines.append(text[start:])
+    return lines
+
+
+class PleadingPdf:
+    """서면 한 부를 조판합니다. 줄을 받는 즉시 그리므로 입력 전체를 들고 있지 않습니다."""
+
+    def __init__(self, out, title, fonts=None, pagesize=A4):
+        self.body_font, self.bold_font = fonts or get_fonts()
+        self.width, self.height = pagesize
+        self.left, self.right, self.top, self.bottom = PAGE_MARGINS
+        self.text_width = self.width - self.left - self.right
+        self.c = canvas.Canvas(out, pagesize=pagesize, pageCompression=1)
+        self.c.setTitle(title)
+        self.pages = 1
+        self.y = self.height - self.top
+        self._font = None
+        self._blank = True
+        self._draw_title(title)
+
+    def _set_font(self, name, size):
+        if self._font != (name, size):
+            self.c.setFont(name, size)
+            self._font = (name, size)
+
+    def _footer(self):
+        self._set_font(self.body_font, 9)
+        self.c.drawCentredString(self.width / 2, self.bottom / 2, f"- {self.pages} -")
+
+    def _ensure(self, height):
+        if self.y - height >= self.bottom: return
+        self._footer()
+        self.c.showPage()
+        self._font = None   # showPage 후에는 글꼴 설정이 초기화됨
+        self.pages += 1
+        self.y = self.height - self.top
+
+    def _draw(self, text, font, size, x=None, align="left", keep=0.0):
+        # keep: 이 줄과 같은 페이지에 함께 있어야 할 아래 여백 (항목 제목이 페이지 끝에 홀로 남지 않도록)
+        lead = size * LEADING
+        self._ensure(lead + keep)
+        self._set_font(font, size)
+        baseline = self.y - size
+        if align == "center": self.c.drawCentredString(self.width / 2, baseline, text)
+        elif align == "right": self.c.drawRightString(self.width - self.right, baseline, text)
+        else: self.c.drawString(self.left if x is None else x, baseline, text)
+        self.y -= lead
+
+    def _draw_title(self, title):
+        t = title.strip()
+        if len(t.replace(" ", "")) <= 4: t = " ".join(t.replace(" ", ""))   # 소장 → 소 장
+        self._draw(t, self.bold_font, TITLE_SIZE, align="center")
+        self.y -= BODY_SIZE
+
+    def _draw_wrapped(self, label, text, level, font=None, size=BODY_SIZE):
+        # 번호/증거 라벨은 내어쓰기: 둘째 줄부터 라벨 폭만큼 들여 씀
+        font = font or self.body_font
+        x = self.left + level * INDENT
+        label_w = text_width(label, font, size) if label else 0.0
+        for i, part in enumerate(wrap_text(text, font, size, self.text_width - level * INDENT - label_w)):
+            if i == 0: self._draw(label + part, font, size, x=x)
+            else: self._draw(part, font, size, x=x + label_w)
+
+    def _draw_party(self, text):
+        # "라벨\t값" → 라벨은 왼쪽, 값은 PARTY_TAB 위치에서 시작 (길면 그 위치에 맞춰 줄바꿈)
+        label, _, value = text.partition("\t")
+        label_w = max(PARTY_TAB, text_width(label, self.body_font, BODY_SIZE) + BODY_SIZE)
+        for i, part in enumerate(wrap_text(value, self.body_font, BODY_SIZE, self.text_width - label_w) or [""]):
+            if i == 0: self._draw_label(label)
+            self._draw(part, self.body_font, BODY_SIZE, x=self.left + label_w)
+
+    def _draw_label(self, label):
+        # 값과 같은 줄에 그리도록 줄 이동 없이 라벨만 찍음
+        self._ensure(BODY_SIZE * LEADING)
+        self._set_font(self.body_font, BODY_SIZE)
+        self.c.drawString(self.left, self.y - BODY_SIZE, label)
+
+    def add_line(self, raw):
+        self.add_classified(classify_line(raw.rstrip("\r\n")) if raw.strip() else None)
+
+    def add_classified(self, line):
+        """분류된 줄 (종류, 라벨, 본문, 단계) 하나를 조판합니다. None 은 빈 줄."""
+        if line is None:
+            if not self._blank: self.y -= BODY_SIZE * 0.6
+            self._blank = True
+            return
+        self._blank = False
+        kind, label, text, level = line
+        keep = BODY_SIZE * LEADING * 2
+        if kind == "party":
+            self._draw_party(text)
+        elif kind == "section":
+            self.y -= BODY_SIZE * 0.5
+            self._draw(text, self.bold_font, HEADING_SIZE, align="center", keep=keep)
+        elif kind == "heading":
+            self._draw_wrapped("", text, 0, self.bold_font, HEADING_SIZE)
+        elif kind == "court":
+            self.y -= BODY_SIZE
+            self._draw(text, self.bold_font, HEADING_SIZE + 2, align="center")
+        elif kind == "date":
+            self._draw(text, self.body_font, BODY_SIZE, align="center")
+        elif kind == "sign":
+            self._draw(text, self.body_font, BODY_SIZE, align="right")
+        else:
+            self._draw_wrapped(label, text, level)
+
+    def finish(self):
+        self._footer()
+        self.c.save()
+        return self.pages
+
+
+def iter_lines(chunks):
+    """임의로 잘린 텍스트 조각(스트리밍 응답 등)을 줄 단위로 다시 묶습니다."""
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split("\n")
+        yield from lines
+    if buf: yield buf
+
+
+def stream_pdf(title, lines, out, fonts=None):
+    """lines: 줄 단위 이터러블, out: 파일 경로 또는 쓰기 가능한 파일 객체. 반환: 페이지 수."""
+    doc = PleadingPdf(out, title, fonts)
+    for line in lines: doc.add_line(line)
+    return doc.finish()
+
+
+def render_pdf(title, content, fields=None):
+    """서면 PDF. Word 출력(render_docx)과 같은 양식에 fields(당사자/법원/금액/증거)를 채워 조판합니다."""
+    heading, lines = template_lines(title, content, fields)
+    buffer = BytesIO()
+    doc = PleadingPdf(buffer, heading)
+    for line in lines: doc.add_classified(line)
+    doc.finish()
+    buffer.seek(0)
+    return buffer
+
+
+# ---- 벤치마크 ------------------------------------------------------------
+def sample_document(paragraphs=30):
+    body = ("채무자는 채권자로부터 위 금원을 차용하면서 변제기까지 원금 및 약정이자를 지급하기로 약정하였으나, "
+            "변제기가 지난 현재까지 채권자의 수차례 독촉에도 불구하고 정당한 사유 없이 이를 지급하지 아니하고 있습니다.")
+    lines = ["## 청구취지", "1. 채무자는 채권자에게 30,000,000원 및 이에 대하여 2024. 1. 1.부터 다 갚는 날까지 "
+             "연 12%의 비율로 계산한 돈을 지급하라.", "2. 독촉절차비용은 채무자가 부담한다.", "", "## 청구원인"]
+    for i in range(1, paragraphs + 1):
+        lines.append(f"{i}. {body}")
+        if i % 5 == 0: lines.append(f"  가. 세부 사실관계 {i}: {body[:60]}")
+    lines += ["", "## 입증방법", "갑 제1호증 (차용증)", "갑 제2호증 (이체내역서)", "갑 제3호증 (카카오톡 대화록)",
+              "", "2024. 3. 1.", "채권자 홍길동 (인)", "서울중앙지방법원 귀중"]
+    return "\n".join(lines)
+
+
+def benchmark(docs=100, paragraphs=30):
+    text = sample_document(paragraphs)
+    get_fonts()   # 글꼴 등록은 측정에서 제외 (프로세스당 한 번)
+    pages, size = 0, 0
+    started = time.perf_counter()
+    for _ in range(docs):
+        buf = BytesIO()
+        pages += stream_pdf("지급명령신청서", StringIO(text), buf)
+        size = len(buf.getvalue())
+    elapsed = time.perf_counter() - started
+    return {"font": get_fonts()[0], "docs": docs, "pages": pages, "seconds": round(elapsed, 3),
+            "pages_per_sec": round(pages / elapsed, 1), "docs_per_sec": round(docs / elapsed, 1),
+            "bytes_per_doc": size}
+
+
+def benchmark_long(pages=300):
+    import tracemalloc
+    body = sample_document(30).split("\n")
+    per_page = 20
+
+    def lines():
+        # 입력도 생성기로 흘려보내 전체 문자열을 만들지 않음
+        for i in range(pages * per_page): yield body[i % len(body)]
+    started = time.perf_counter()
+    n = stream_pdf("소장", lines(), BytesIO())
+    elapsed = time.perf_counter() - started
+    # 메모리는 별도 실행으로 측정 (tracemalloc 이 조판 속도를 크게 떨어뜨림)
+    tracemalloc.start()
+    stream_pdf("소장", lines(), BytesIO())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"pages": n, "seconds": round(elapsed, 3), "pages_per_sec": round(n / elapsed, 1),
+            "peak_mb": round(peak / 2 ** 20, 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI 법률 마스터 - 한글 서면 PDF 변환 / 벤치마크")
+    parser.add_argument("input", nargs="?", help="변환할 텍스트 파일 (UTF-8)")
+    parser.add_argument("-o", "--out", help="PDF 경로 (기본: 입력 파일명.pdf)")
+    parser.add_argument("--title", default="법률 서면")
+    parser.add_argument("--bench", action="store_true", help="초당 페이지 수 측정")
+    parser.add_argument("--docs", type=int, default=100, help="벤치마크 문서 수")
+    parser.add_argument("--paragraphs", type=int, default=30, help="벤치마크 문서당 문단 수")
+    parser.add_argument("--long-pages", type=int, default=0, help="긴 문서 스트리밍 조판 측정 (페이지 수)")
+    args = parser.parse_args(argv)
+
+    if args.bench or args.long_pages:
+        if args.bench:
+            r = benchmark(args.docs, args.paragraphs)
+            print(f"[{r['font']}] {r['docs']}건 / {r['pages']}쪽 {r['seconds']}초 → "
+                  f"{r['pages_per_sec']} 쪽/초, {r['docs_per_sec']} 건/초 (문서당 {r['bytes_per_doc'] / 1024:.0f}KB)")
+        if args.long_pages:
+            r = benchmark_long(args.long_pages)
+            print(f"긴 문서 {r['pages']}쪽 {r['seconds']}초 → {r['pages_per_sec']} 쪽/초, 최대 메모리 {r['peak_mb']}MB")
+        return 0
+    if not args.input: parser.error("입력 파일 또는 --bench 가 필요합니다")
+    out = args.out or os.path.splitext(args.input)[0] + ".pdf"
+    with open(args.input, encoding="utf-8-sig") as f:
+        pages = stream_pdf(args.title, f, out)
+    print(f"{out} ({pages}쪽)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
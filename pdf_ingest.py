@@ -0,0 +1,88 @@
+# -------------------------------------------------------------------------
+# PDF 사건 기록 추출 엔진 (app16.py [NEW FEATURE 2] 의 성능 개선판)
+# - 페이지 단위로 지연 추출하고, 필요한 글자 수(max_chars)를 채우면 즉시 중단
+# - PDF 는 한 번만 파싱 (페이지 수 확인과 추출이 같은 reader 사용)
+#   프로세스 풀 병렬 추출은 작업마다 PDF 전체를 보내고 다시 파싱하느라 300쪽 기준 순차보다 느려 제거
+# - 파일 다이제스트 기준 캐시로 리런 시 재파싱 방지
+# -------------------------------------------------------------------------
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from pypdf import PdfReader
+
+MAX_PDF_BYTES = 50 * 1024 * 1024   # 업로드 허용 최대 크기
+MAX_PDF_PAGES = 2000               # 추출 최대 페이지 수
+PDF_CACHE_ENTRIES = 32             # 다이제스트 캐시 항목 수
+
+_cache = OrderedDict()   # digest -> (text, complete, page_count)
+_cache_lock = threading.Lock()
+
+
+class PdfTooLargeError(ValueError):
+    pass
+
+
+def read_pdf_bytes(file):
+    # Streamlit UploadedFile, 파일 객체, bytes 모두 허용
+    if isinstance(file, (bytes, bytearray)): return bytes(file)
+    if hasattr(file, "getvalue"): return file.getvalue()
+    if hasattr(file, "seek"): file.seek(0)
+    return file.read()
+
+
+def pdf_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_pdf_pages(data, start=0, stop=None, reader=None):
+    pages = (reader or PdfReader(BytesIO(data))).pages
+    stop = min(len(pages), MAX_PDF_PAGES) if stop is None else min(stop, len(pages))
+    for i in range(start, stop):
+        yield pages[i].extract_text() or ""
+
+
+def _cache_get(digest):
+    with _cache_lock:
+        hit = _cache.get(digest)
+        if hit: _cache.move_to_end(digest)
+        return hit
+
+
+def _cache_put(digest, entry):
+    with _cache_lock:
+        prev = _cache.get(digest)
+        # 더 많이 추출된 결과만 덮어씀
+        if prev and (prev[1] or len(prev[0]) >= len(entry[0])) and not entry[1]: return
+        _cache[digest] = entry
+        _cache.move_to_end(digest)
+        while len(_cache) > PDF_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def extract_pdf_text(file, max_chars=None):
+    """PDF 텍스트를 추출합니다. max_chars를 주면 그 길이를 채우는 페이지까지만 읽습니다.
+
+    반환값: (text, complete, page_count)
+    """
+    data = read_pdf_bytes(file)
+    if len(data) > MAX_PDF_BYTES:
+        raise PdfTooLargeError(f"파일이 너무 큽니다 (최대 {MAX_PDF_BYTES // (1024 * 1024)}MB)")
+    digest = pdf_digest(data)
+    hit = _cache_get(digest)
+    if hit and (hit[1] or (max_chars is not None and len(hit[0]) >= max_chars)):
+        return hit
+
+    reader = PdfReader(BytesIO(data))
+    page_count = min(len(reader.pages), MAX_PDF_PAGES)
+    parts, size, complete = [], 0, True
+    for i, t in enumerate(iter_pdf_pages(data, 0, page_count, reader)):
+        parts.append(t + "\n")
+        size += len(t) + 1
+        if max_chars is not None and size >= max_chars and i + 1 < page_count:
+            complete = False
+            break
+    entry = ("".join(parts), complete, page_count)
+    _cache_put(digest, entry)
+    return entry
@@ -0,0 +1,416 @@
+# -------------------------------------------------------------------------
+# 성능 벤치마크 / 회귀 검사 (오프라인 실행)
+# - 법원 매칭, 사건 유형 판별, 마스킹, 비용/타임라인 계산, 증거 목록, PDF 추출(수백 쪽 합성 PDF),
+#   DOCX/PDF 내보내기, AI 호출 경로(로컬 스텁), AppTest 전체 리런을 측정
+# - Gemini 는 지연 시간을 설정할 수 있는 로컬 스텁으로 대체 (네트워크/API 키 불필요)
+# - 결과를 기준선(JSON)으로 저장하고, 이후 실행과 중앙값 비율 + Mann-Whitney U 검정으로 비교
+# - 임계값(--threshold)보다 느려졌고 통계적으로 유의하면 종료 코드 1 → CI에서 회귀 감지용
+#
+# 사용 예:
+#   python perf_bench.py --save                     # 측정 후 기준선 저장
+#   python perf_bench.py                            # 측정 후 기준선과 비교
+#   python perf_bench.py -k court,mask --repeat 30  # 일부만
+#   python perf_bench.py --no-app --threshold 0.15 --json bench.json
+# -------------------------------------------------------------------------
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "bench_baseline.json")
+DEFAULT_REPEAT = 15
+MIN_SAMPLE_TIME = 0.05      # 샘플 하나의 최소 측정 시간 (짧은 함수는 여러 번 묶어서 측정)
+DEFAULT_THRESHOLD = 0.10    # 중앙값이 10% 넘게 느려지면 회귀 후보
+DEFAULT_ALPHA = 0.05        # 유의 수준
+STUB_LATENCY = 0.05         # Gemini 스텁 응답 지연 (초)
+STUB_REQUESTS_PER_MINUTE = 10 ** 6
+PDF_PAGES = 300
+
+BENCHMARKS = OrderedDict()  # 이름 -> (그룹, 준비 함수)
+
+
+def bench(name, group="core"):
+    """준비 함수 setup(opts) 는 측정할 인자 없는 함수를 반환합니다."""
+    def register(setup):
+        BENCHMARKS[name] = (group, setup)
+        return setup
+    return register
+
+
+# ---- 합성 데이터 ---------------------------------------------------------
+def _addresses(n=1000):
+    from legal_data import JURISDICTION_MAP
+    rng = random.Random(42)
+    regions = list(JURISDICTION_MAP)
+    return [f"{rng.choice(regions)} {rng.choice(['중앙로', '시청로', '역삼로'])} {rng.randint(1, 999)}" for _ in range(n)]
+
+
+def _facts(n=200):
+    rng = random.Random(7)
+    words = ["임대차 계약이 끝났는데 보증금을 돌려주지 않습니다", "돈을 빌려줬는데 갚지 않습니다",
+             "물품 대금을 받지 못했습니다", "교통사고로 다쳤습니다", "공사 대금이 미지급되었습니다",
+             "상대방과 여러 차례 통화했지만", "카카오톡으로 독촉했으나", "2024년 1월부터"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(5, 40))) for _ in range(n)]
+
+
+def _pii_text(kb=50):
+    line = "원고 홍길동(900101-1234567, 010-1234-5678, hong@example.com)은 피고에게 다음과 같이 청구합니다. "
+    return line * (kb * 1024 // len(line.encode("utf-8")) + 1)
+
+
+def _sample_pdf(pages=PDF_PAGES):
+    from pdf_export import sample_document, stream_pdf
+    body = sample_document(30).split("\n")
+    buf = BytesIO()
+    stream_pdf("소장", (body[i % len(body)] for i in range(pages * 20)), buf)
+    return buf.getvalue()
+
+
+# ---- Gemini 스텁 ---------------------------------------------------------
+def install_gemini_stub(latency=STUB_LATENCY, chunks=10):
+    """google.generativeai 를 지연 시간만 흉내 내는 로컬 모델로 바꿉니다 (같은 프로세스의 AppTest 포함)."""
+    import asyncio
+    import types
+    import google.generativeai as genai
+    from google.generativeai import client as genai_client
+
+    class StubModel:
+        def __init__(self, model_name, *args, **kwargs):
+            self.model_name = model_name
+
+        async def generate_content_async(self, parts, stream=False, request_options=None):
+            prompt = parts if isinstance(parts, str) else parts[0]
+            text = f"[스텁 응답] {prompt.strip()[:40]} " + "본문 " * 200
+            if not stream:
+                await asyncio.sleep(latency)
+                return types.SimpleNamespace(text=text)
+            step = len(text) // chunks + 1
+
+            class Stream:
+                def __aiter__(self):
+                    async def gen():
+                        for i in range(0, len(text), step):
+                            await asyncio.sleep(latency / chunks)
+                            yield types.SimpleNamespace(text=text[i:i + step])
+                    return gen()
+            return Stream()
+
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = StubModel
+    genai_client.get_default_generative_async_client = lambda: None
+    # 스텁에는 할당량이 없으므로 분당 호출 제한 대기는 측정에서 제외 (동시 실행 수 제한은 유지)
+    from legal_core import get_gemini_client
+    get_gemini_client().configure(per_minute=STUB_REQUESTS_PER_MINUTE, burst=STUB_REQUESTS_PER_MINUTE)
+
+
+# ---- 벤치마크 정의 -------------------------------------------------------
+@bench("find_best_court x1000")
+def _bench_court(opts):
+    from legal_core import find_best_court
+    addrs = _addresses()
+    return lambda: [find_best_court(a, "민사소송") for a in addrs]
+
+
+@bench("detect_scenario x200")
+def _bench_scenario(opts):
+    from legal_core import detect_scenario
+    texts = _facts()
+    return lambda: [detect_scenario(t) for t in texts]
+
+
+@bench("detect_scenario x200 (uncached)")
+def _bench_scenario_cold(opts):
+    from legal_core import get_scenario_classifier
+    classify, texts = get_scenario_classifier()._classify, _facts()
+    return lambda: [classify(t) for t in texts]
+
+
+@bench("detect_scenarios 5000 (batch)")
+def _bench_scenario_batch(opts):
+    from legal_core import detect_scenarios
+    texts = _facts(5000)
+    return lambda: detect_scenarios(texts)
+
+
+@bench("mask_sensitive_data 50KB")
+def _bench_mask(opts):
+    from legal_core import mask_sensitive_data
+    text = _pii_text()
+    return lambda: mask_sensitive_data(text)
+
+
+@bench("calculate_legal_costs x1000")
+def _bench_costs(opts):
+    from legal_core import calculate_legal_costs
+    rng = random.Random(3)
+    amounts = [str(rng.randint(1, 10 ** 9)) for _ in range(1000)]
+    return lambda: [calculate_legal_costs(a) for a in amounts]
+
+
+@bench("predict_detailed_timeline x1000")
+def _bench_timeline(opts):
+    from legal_core import predict_detailed_timeline
+    amounts = [str(a * 1000) for a in range(1000)]
+    return lambda: [predict_detailed_timeline(a) for a in amounts]
+
+
+@bench("create_evidence_list_formatted 200")
+def _bench_evidence(opts):
+    from legal_core import create_evidence_list_formatted
+    text = "\n".join(f"증거 자료 {i} (이체내역서)" for i in range(200))
+    return lambda: create_evidence_list_formatted(text)
+
+
+@bench(f"extract_text_from_pdf {PDF_PAGES}p (cold)", "io")
+def _bench_pdf_extract(opts):
+    import pdf_ingest
+    from legal_core import extract_text_from_pdf
+    data = _sample_pdf()
+
+    def run():
+        pdf_ingest._cache.clear()   # 다이제스트 캐시를 비워 실제 추출을 측정
+        text = extract_text_from_pdf(BytesIO(data))
+        if text.startswith("PDF 읽기 오류"): raise RuntimeError(text)
+    return run
+
+
+@bench(f"extract_text_from_pdf {PDF_PAGES}p (preview)", "io")
+def _bench_pdf_preview(opts):
+    import pdf_ingest
+    from legal_core import extract_text_from_pdf, PDF_APPLY_CHARS
+    data = _sample_pdf()
+
+    def run():
+        pdf_ingest._cache.clear()
+        extract_text_from_pdf(BytesIO(data), max_chars=PDF_APPLY_CHARS)
+    return run
+
+
+@bench("create_docx", "export")
+def _bench_docx(opts):
+    from legal_core import create_docx
+    from pdf_export import sample_document
+    text = sample_document(30)
+    return lambda: create_docx("지급명령신청서", text)
+
+
+@bench("create_docx x100 (양식 + 입력값)", "export")
+def _bench_docx_batch(opts):
+    from legal_core import create_docx
+    from pdf_export import sample_document
+    from docx_export import TEMPLATES, sample_fields
+    text, fields, titles = sample_document(30), sample_fields(), list(TEMPLATES)
+    return lambda: [create_docx(titles[i % len(titles)], text, fields) for i in range(100)]
+
+
+@bench("create_pdf", "export")
+def _bench_pdf(opts):
+    from legal_core import create_pdf
+    from pdf_export import sample_document
+    text = sample_document(30)
+    return lambda: create_pdf("지급명령신청서", text)
+
+
+@bench("get_gemini_response (stub)", "ai")
+def _bench_gemini(opts):
+    from legal_core import get_gemini_response
+    prompt = "전세 보증금 반환 소송 절차를 알려주세요. 연락처 010-1234-5678"
+
+    def run():
+        res = get_gemini_response("stub-key", "models/stub", prompt, use_cache=False)
+        if res.startswith("❌"): raise RuntimeError(res)
+    return run
+
+
+@bench("run_concurrently x4 (stub)", "ai")
+def _bench_fanout(opts):
+    from legal_core import get_gemini_response, run_concurrently
+    tasks = {f"t{i}": (lambda i=i: get_gemini_response("stub-key", "models/stub", f"질문 {i}", use_cache=False))
+             for i in range(4)}
+    return lambda: list(run_concurrently(tasks))
+
+
+def _app(opts):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(HERE, "app16.py"), default_timeout=60)
+    at.run()
+    at.sidebar.toggle[0].set_value(False)                       # 응답 캐시 끄기 (매번 스텁 호출)
+    at.sidebar.radio[0].set_value(at.sidebar.radio[0].options[1]).run()
+    if at.exception: raise RuntimeError(at.exception[0].message)
+    return at
+
+
+@bench("app rerun (idle)", "app")
+def _bench_app_rerun(opts):
+    at = _app(opts)
+    return lambda: at.run()
+
+
+@bench("app generate document (stub)", "app")
+def _bench_app_generate(opts):
+    at = _app(opts)
+
+    def run():
+        next(b for b in at.button if "서류 생성" in b.label).click().run()
+        if at.exception: raise RuntimeError(at.exception[0].message)
+    return run
+
+
+# ---- 측정 / 통계 ---------------------------------------------------------
+def measure(fn, repeat=DEFAULT_REPEAT, min_time=MIN_SAMPLE_TIME):
+    """1회 실행 시간(초) 샘플 목록. 짧은 함수는 min_time 이상이 되도록 묶어서 잰 뒤 평균을 씁니다."""
+    fn()  # 워밍업 (지연 import, 캐시 초기화)
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number): fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 10 ** 6: break
+        number *= 10 if elapsed < min_time / 10 else 2
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number): fn()
+        samples.append((time.perf_counter() - started) / number)
+    return samples, number
+
+
+def median(xs):
+    s = sorted(xs)
+    n = len(s)
+    return s[n // 2] if n % 2 else (s[n // 2 - 1] + s[n // 2]) / 2
+
+
+def mann_whitney_p(a, b):
+    """양측 Mann-Whitney U 검정 p-값 (정규 근사, 동순위 보정). 분포 가정이 없어 측정 잡음에 강함."""
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2: return 1.0
+    pooled = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks, ties, i = [0.0] * len(pooled), 0.0, 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]: j += 1
+        for k in range(i, j + 1): ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    r1 = sum(r for r, (_, g) in zip(ranks, pooled) if g == 0)
+    u = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0: return 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / sigma
+    return min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, alpha=DEFAULT_ALPHA):
+    """반환: {이름: {"ratio", "p", "status"}}  status: regression / improved / same / new"""
+    out = {}
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base:
+            out[name] = {"ratio": None, "p": None, "status": "new"}
+            continue
+        ratio = median(cur["samples"]) / median(base["samples"])
+        p = mann_whitney_p(cur["samples"], base["samples"])
+        status = "same"
+        if p < alpha and ratio > 1 + threshold: status = "regression"
+        elif p < alpha and ratio < 1 - threshold: status = "improved"
+        out[name] = {"ratio": round(ratio, 3), "p": round(p, 4), "status": status}
+    return out
+
+
+def environment():
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def run_suite(selected, repeat, stub_latency, progress=None):
+    install_gemini_stub(stub_latency)
+    results = OrderedDict()
+    for name in selected:
+        group, setup = BENCHMARKS[name]
+        fn = setup({"stub_latency": stub_latency})
+        # AppTest/PDF 추출처럼 무거운 항목은 샘플 수를 줄여 전체 실행 시간을 제한
+        samples, number = measure(fn, repeat if group in ("core", "export") else max(5, repeat // 2))
+        results[name] = {"group": group, "samples": samples, "number": number, "median": median(samples)}
+        if progress: progress(name, results[name])
+    return results
+
+
+def _fmt(sec):
+    return f"{sec * 1000:.3f} ms" if sec < 1 else f"{sec:.2f} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI 법률 마스터 - 성능 벤치마크 / 회귀 검사")
+    parser.add_argument("-k", "--only", help="이름에 포함된 문자열로 선택 (쉼표 구분)")
+    parser.add_argument("--no-app", action="store_true", help="AppTest 리런 항목 제외")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="항목별 샘플 수")
+    parser.add_argument("--stub-latency", type=float, default=STUB_LATENCY, help="Gemini 스텁 응답 지연 (초)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준선 JSON 경로")
+    parser.add_argument("--save", action="store_true", help="이번 결과를 기준선으로 저장")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀로 볼 중앙값 증가 비율")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="유의 수준")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--list", action="store_true", help="항목 목록만 출력")
+    args = parser.parse_args(argv)
+
+    selected = [n for n, (g, _) in BENCHMARKS.items() if not (args.no_app and g == "app")]
+    if args.only:
+        keys = [k.strip().lower() for k in args.only.split(",") if k.strip()]
+        selected = [n for n in selected if any(k in n.lower() for k in keys)]
+    if args.list or not selected:
+        print("\n".join(f"[{BENCHMARKS[n][0]}] {n}" for n in selected) or "선택된 항목이 없습니다.")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, encoding="utf-8") as f: stored = json.load(f)
+        baseline = stored.get("results", {})
+        if stored.get("env", {}).get("platform") != platform.platform():
+            print(f"⚠️ 기준선 측정 환경이 다릅니다: {stored.get('env', {}).get('platform')}")
+
+    def progress(name, r):
+        print(f"  {name:<42} {_fmt(r['median']):>12}  (x{r['number']}, n={len(r['samples'])})", file=sys.stderr)
+
+    print(f"벤치마크 {len(selected)}개 실행 (Gemini 스텁 지연 {args.stub_latency * 1000:.0f} ms)", file=sys.stderr)
+    results = run_suite(selected, args.repeat, args.stub_latency, progress)
+    report = {"env": environment(), "stub_latency": args.stub_latency, "results": results}
+
+    regressions = []
+    if baseline:
+        verdicts = compare(results, baseline, args.threshold, args.alpha)
+        marks = {"regression": "❌ 회귀", "improved": "✅ 개선", "same": "  동일", "new": "  신규"}
+        print(f"{'항목':<42} {'현재':>12} {'기준선':>12} {'비율':>7} {'p':>7}")
+        for name, v in verdicts.items():
+            base = _fmt(median(baseline[name]["samples"])) if name in baseline else "-"
+            ratio = f"{v['ratio']:.2f}x" if v["ratio"] else "-"
+            p = f"{v['p']:.3f}" if v["p"] is not None else "-"
+            print(f"{name:<42} {_fmt(results[name]['median']):>12} {base:>12} {ratio:>7} {p:>7}  {marks[v['status']]}")
+            results[name]["verdict"] = v
+        regressions = [n for n, v in verdicts.items() if v["status"] == "regression"]
+    elif not args.save:
+        print(f"기준선이 없습니다 ({args.baseline}). --save 로 저장하세요.")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f: json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"기준선 저장: {args.baseline}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(report, f, ensure_ascii=False, indent=1)
+
+    if regressions:
+        print(f"❌ 성능 회귀 {len(regressions)}건 (>{args.threshold:.0%}, p<{args.alpha}): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
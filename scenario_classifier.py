@@ -0,0 +1,177 @@
+# -------------------------------------------------------------------------
+# 사건 유형 분류기 (SCENARIO_LOGIC 기반, 데이터 주도)
+# - 모든 유형의 키워드를 하나의 정규식(긴 키워드 우선 대안)으로 미리 컴파일 → 본문을 한 번만 순회
+#   (파이썬 구현 Aho-Corasick 보다 re 엔진의 C 루프가 1~2천 자 본문에서 약 6배 빠름)
+# - 겹치는 매칭은 가장 왼쪽·가장 긴 키워드만 인정 ("차용증" 안의 "차용"을 중복 집계하지 않음)
+# - 점수 = 가중치 × (1 + log 등장 횟수) × (앞부분 가중), 여러 유형에 걸친 키워드는 유형 수로 나눠 반영
+# - 같은 본문은 해시 기준 캐시에서 즉시 반환, classify_many 는 중복 본문을 한 번만 분류 (대량 처리는 캐시를 거치지 않음)
+# - 유형/키워드/가중치는 JSON 설정 파일(LEGAL_SCENARIO_CONFIG)로 추가·변경 가능 (코드 수정 불필요)
+#
+# 설정 파일 예 (SCENARIO_LOGIC 과 같은 형식, 키워드는 "단어" 또는 ["단어", 가중치]):
+#   {"LEASE_CAR": {"label": "🚗 차량 리스", "weights": ["리스", ["렌터카", 1.5], "차량"]},
+#    "ESTATE": {"label": "🏘️ 부동산 계약", "weights": ["부동산", "매매", ["계약", 0.3]]},
+#    "SALES": null}                                      ← null 이면 기본 유형 제외
+#
+# 사용 예:
+#   python scenario_classifier.py intake.csv --field facts -o scenarios.csv
+#   python scenario_classifier.py narratives.txt --explain --config scenarios.json
+# -------------------------------------------------------------------------
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+from collections import Counter, OrderedDict
+
+CONFIG_ENV = "LEGAL_SCENARIO_CONFIG"
+DEFAULT_KEY = "GENERAL"
+DEFAULT_LABEL = "📝 일반 민사"
+LEAD_CHARS = 300        # 사건 경위 앞부분(요지)으로 보는 길이
+LEAD_BOOST = 0.5        # 앞부분에 처음 등장한 키워드의 추가 가중
+CACHE_ENTRIES = 4096
+
+
+def _entries(weights):
+    for item in weights:
+        if isinstance(item, str): yield item, 1.0
+        else:
+            keyword, weight = item
+            yield keyword, float(weight)
+
+
+def load_scenarios(path=None, base=None):
+    """기본 유형(base)에 설정 파일(path 또는 LEGAL_SCENARIO_CONFIG)의 유형을 덮어써 반환합니다."""
+    scenarios = dict(base or {})
+    path = path or os.environ.get(CONFIG_ENV)
+    if not path: return scenarios
+    with open(path, encoding="utf-8") as f: extra = json.load(f)
+    for key, spec in extra.items():
+        if spec is None:
+            scenarios.pop(key, None)
+            continue
+        if not isinstance(spec, dict) or "label" not in spec:
+            raise ValueError(f"{path}: '{key}' 유형에 label 이 없습니다.")
+        try: list(_entries(spec.get("weights", [])))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{path}: '{key}' 유형의 weights 형식이 올바르지 않습니다 ({e}).") from e
+        scenarios[key] = spec
+    return scenarios
+
+
+class ScenarioClassifier:
+    def __init__(self, scenarios, default=DEFAULT_KEY, lead_chars=LEAD_CHARS, lead_boost=LEAD_BOOST,
+                 cache_entries=CACHE_ENTRIES):
+        self.scenarios = scenarios
+        self.keys = list(scenarios)
+        self.default = default
+        self.default_label = scenarios[default]["label"] if default in scenarios else DEFAULT_LABEL
+        self.lead_chars = lead_chars
+        self.lead_boost = lead_boost
+        targets = {}   # 키워드 -> [(유형 순번, 가중치)]
+        for si, key in enumerate(self.keys):
+            for keyword, weight in _entries(scenarios[key].get("weights", ())):
+                targets.setdefault(keyword, []).append((si, weight))
+        # 키워드 -> ((유형 순번, 가중치 / 걸친 유형 수), ...)
+        self.targets = {k: tuple((si, w / len(t)) for si, w in t) for k, t in targets.items() if k}
+        # 같은 위치에서는 먼저 적힌(더 긴) 대안이 이김 → 가장 왼쪽·가장 긴 매칭, 겹침 없음
+        alternatives = sorted(self.targets, key=len, reverse=True)
+        self.pattern = re.compile("|".join(map(re.escape, alternatives))) if alternatives else None
+        self._cache = OrderedDict()
+        self._cache_entries = cache_entries
+        self._lock = threading.Lock()
+
+    def score_vector(self, text):
+        scores = [0.0] * len(self.keys)
+        if not text or self.pattern is None: return scores
+        # 짧은 본문은 전체가 앞부분 → 모든 키워드에 같은 가중 (비교 결과에는 영향 없음)
+        lead = set(self.pattern.findall(text, 0, self.lead_chars)) if len(text) > self.lead_chars else None
+        boost, log, targets = 1 + self.lead_boost, math.log, self.targets
+        for keyword, count in Counter(self.pattern.findall(text)).items():
+            factor = 1 + log(count) if count > 1 else 1.0
+            if lead is None or keyword in lead: factor *= boost
+            for si, weight in targets[keyword]: scores[si] += weight * factor
+        return scores
+
+    def scores(self, text):
+        """유형별 점수 (설명/디버깅용, 캐시 미사용)."""
+        return {key: round(s, 3) for key, s in zip(self.keys, self.score_vector(text))}
+
+    def _classify(self, text):
+        scores = self.score_vector(text)
+        top = max(scores, default=0)
+        return self.keys[scores.index(top)] if top > 0 else self.default   # 동점이면 먼저 정의된 유형
+
+    def classify(self, text):
+        """본문의 유형 키 (점수가 없으면 default)."""
+        if not text: return self.default
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            key = self._cache.get(digest)
+            if key is not None:
+                self._cache.move_to_end(digest)
+                return key
+        key = self._classify(text)
+        with self._lock:
+            self._cache[digest] = key
+            while len(self._cache) > self._cache_entries: self._cache.popitem(last=False)
+        return key
+
+    def classify_many(self, texts):
+        """대량 분류 (같은 본문은 한 번만 계산, 화면용 캐시를 밀어내지 않도록 캐시 미사용)."""
+        seen = {}
+        return [seen[t] if t in seen else seen.setdefault(t, self._classify(t)) for t in texts]
+
+    def label(self, key):
+        spec = self.scenarios.get(key)
+        return spec["label"] if spec else self.default_label
+
+
+# ---- 명령행 (일괄 분류) ---------------------------------------------------
+def read_texts(path, field="facts"):
+    import csv
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            return [json.loads(line).get(field, "") for line in f if line.strip()]
+        if path.lower().endswith(".csv"):
+            return [row.get(field, "") for row in csv.DictReader(f)]
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def main(argv=None):
+    import argparse
+    import csv
+    import time
+    from legal_data import SCENARIO_LOGIC
+    parser = argparse.ArgumentParser(description="AI 법률 마스터 - 사건 유형 일괄 분류")
+    parser.add_argument("input", help="본문 파일 (.txt 한 줄에 하나 / .csv / .jsonl)")
+    parser.add_argument("--field", default="facts", help="CSV/JSONL 의 본문 컬럼")
+    parser.add_argument("--config", help=f"유형 설정 JSON (기본: 환경 변수 {CONFIG_ENV})")
+    parser.add_argument("-o", "--output", help="결과 CSV (순번, 유형, 라벨)")
+    parser.add_argument("--explain", action="store_true", help="건별 유형 점수 출력")
+    args = parser.parse_args(argv)
+
+    classifier = ScenarioClassifier(load_scenarios(args.config, SCENARIO_LOGIC))
+    texts = read_texts(args.input, args.field)
+    started = time.perf_counter()
+    keys = classifier.classify_many(texts)
+    elapsed = time.perf_counter() - started
+    print(f"{len(texts)}건 분류 {elapsed * 1000:.1f} ms (고유 본문 {len(set(texts))}건)")
+    for key, n in Counter(keys).most_common():
+        print(f"{n:>8}  {classifier.label(key)}")
+
+    if args.explain:
+        for i, (text, key) in enumerate(zip(texts, keys), 1):
+            top = sorted(classifier.scores(text).items(), key=lambda kv: -kv[1])[:3]
+            print(f"[{i}] {classifier.label(key)}  {top}  {text[:40]}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["row", "scenario", "label"])
+            writer.writerows((i, key, classifier.label(key)) for i, key in enumerate(keys, 1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
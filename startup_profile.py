@@ -0,0 +1,92 @@
+# -------------------------------------------------------------------------
+# 콜드 스타트 / 리런 시간 측정 리포트
+# - python -X importtime 으로 공용 모듈의 import 시간을 측정해 무거운 import 상위 목록을 출력
+# - (선택) Streamlit AppTest로 app16.py 스크립트 리런 시간을 측정
+# - 예산(--budget-ms)을 넘으면 종료 코드 1 → CI에서 회귀 감지용
+#
+# 사용 예:
+#   python startup_profile.py                       # legal_core import 프로파일
+#   python startup_profile.py --reruns 5            # + 앱 리런 시간
+#   python startup_profile.py --budget-ms 300 --json startup.json
+# -------------------------------------------------------------------------
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULES = ["legal_core", "chat_memory"]
+# 첫 화면 렌더링 시점에 로드되면 안 되는 무거운 라이브러리 (지연 import 대상)
+LAZY_MODULES = ["google.generativeai", "docx", "reportlab", "pypdf", "PIL", "numpy"]
+
+
+def profile_imports(modules):
+    code = "; ".join(f"import {m}" for m in modules) + "; import sys; print(','.join(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=HERE,
+                          capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line: continue
+        self_us, cum_us, name = [p.strip() for p in line[len("import time:"):].split("|")]
+        rows.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cum_us),
+                     "depth": (len(name) - len(name.lstrip())) // 2})
+    loaded = set(proc.stdout.strip().split(","))
+    # 인터프리터 기동(site 등) 분은 제외하고 요청한 모듈의 누적 시간만 합산
+    requested = [r for r in rows if r["depth"] == 0 and r["module"] in modules]
+    return {
+        "modules": modules,
+        "total_ms": round(sum(r["cumulative_us"] for r in requested) / 1000, 1),
+        "top": sorted((r for r in rows if r["module"] != "site"), key=lambda r: -r["cumulative_us"]),
+        "eager_heavy": [m for m in LAZY_MODULES if m in loaded]
+    }
+
+
+def profile_reruns(reruns):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(HERE, "app16.py"), default_timeout=60)
+    started = time.perf_counter(); at.run(); first = time.perf_counter() - started
+    times = []
+    for _ in range(reruns):
+        started = time.perf_counter(); at.run(); times.append(time.perf_counter() - started)
+    times.sort()
+    return {"first_run_ms": round(first * 1000, 1), "rerun_median_ms": round(times[len(times) // 2] * 1000, 1),
+            "rerun_max_ms": round(times[-1] * 1000, 1), "reruns": reruns}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI 법률 마스터 - 시작 시간 프로파일")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=15, help="출력할 무거운 import 개수")
+    parser.add_argument("--reruns", type=int, default=0, help="AppTest 리런 측정 횟수 (0이면 생략)")
+    parser.add_argument("--budget-ms", type=float, default=0, help="import 시간 예산 (초과 시 종료 코드 1)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    report = profile_imports(args.modules)
+    print(f"공용 모듈 import 합계: {report['total_ms']} ms ({', '.join(args.modules)})")
+    print(f"{'cumulative(ms)':>15} {'self(ms)':>10}  module")
+    for r in report["top"][:args.top]:
+        print(f"{r['cumulative_us'] / 1000:>15.1f} {r['self_us'] / 1000:>10.1f}  {'  ' * r['depth']}{r['module']}")
+    if report["eager_heavy"]:
+        print(f"⚠️ 시작 시 로드된 무거운 라이브러리: {', '.join(report['eager_heavy'])}")
+
+    if args.reruns:
+        report["app"] = profile_reruns(args.reruns)
+        app = report["app"]
+        print(f"app16.py 첫 실행 {app['first_run_ms']} ms / 리런 중앙값 {app['rerun_median_ms']} ms (최대 {app['rerun_max_ms']} ms)")
+
+    if args.json:
+        report["top"] = report["top"][:args.top]
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.budget_ms and report["total_ms"] > args.budget_ms:
+        print(f"❌ import 시간 {report['total_ms']} ms > 예산 {args.budget_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# -------------------------------------------------------------------------
+# 성능 계측 (타이밍 스팬 / AI 호출 지표 / 리런 합계)
+# - @timed("이름") / with span("이름"): 호출 횟수, 누적 시간, 히스토그램, 최근 샘플(p50/p95 계산용)
+# - record_ai_call(): 모델, 프롬프트 길이, 지연 시간, 첫 토큰까지 시간, 토큰 수(추정), 캐시 적중, 오류 종류
+# - start_rerun() / finish_rerun(): Streamlit 리런 한 번 동안 실행된 스팬을 모아 합계/내역을 남김
+# - 내보내기: Prometheus 텍스트 형식(/metrics), JSONL 이벤트 로그 (AI 호출, 리런)
+# - 모든 값은 프로세스 공용 (Streamlit 세션 / 배치 워커 스레드 전체 합산)
+#
+# 환경 변수:
+#   LEGAL_TELEMETRY=0          계측 끄기 (데코레이터가 원래 함수를 그대로 반환)
+#   LEGAL_METRICS_LOG=path     AI 호출/리런 이벤트를 JSONL 로 기록
+#   LEGAL_METRICS_PORT=9464    http://localhost:9464/metrics 에서 Prometheus 형식으로 노출
+#   LEGAL_ADMIN_TOKEN=...      app16.py 를 ?admin=<토큰> 으로 열면 사이드바 진단 패널 표시
+# -------------------------------------------------------------------------
+import contextvars
+import functools
+import hmac
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("LEGAL_TELEMETRY", "1") != "0"
+LOG_PATH = os.environ.get("LEGAL_METRICS_LOG", "")
+METRICS_PORT = int(os.environ.get("LEGAL_METRICS_PORT", "0") or 0)
+ADMIN_TOKEN = os.environ.get("LEGAL_ADMIN_TOKEN", "")
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RESERVOIR = 1024            # 백분위 계산에 쓰는 최근 샘플 수 (연산별)
+RECENT_AI_CALLS = 200
+
+_current_rerun = contextvars.ContextVar("legal_rerun", default=None)
+
+
+class OpStats:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.recent = deque(maxlen=RESERVOIR)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max: self.max = seconds
+            self.buckets[bisect_left(BUCKETS, seconds)] += 1
+            self.recent.append(seconds)
+        trace = _current_rerun.get()
+        if trace is not None: trace.add(self.name, seconds)
+
+    def summary(self):
+        with self._lock:
+            samples = sorted(self.recent)
+            count, total, peak = self.count, self.total, self.max
+        pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+        return {"op": self.name, "count": count, "total_ms": round(total * 1000, 1),
+                "p50_ms": round(pick(0.5) * 1000, 2), "p95_ms": round(pick(0.95) * 1000, 2),
+                "max_ms": round(peak * 1000, 2)}
+
+
+class RerunTrace:
+    def __init__(self, label):
+        self.label = label
+        self.started = time.perf_counter()
+        self.ops = Counter()        # 연산 -> 누적 초 (중첩 스팬은 각각 포함 시간으로 집계)
+        self.calls = Counter()
+
+    def add(self, op, seconds):
+        self.ops[op] += seconds
+        self.calls[op] += 1
+
+
+class Registry:
+    def __init__(self):
+        self.ops = {}
+        self.ai_calls = deque(maxlen=RECENT_AI_CALLS)
+        self.ai_totals = Counter()  # (모델, 캐시, 상태) -> 횟수
+        self.ai_tokens = Counter()  # (모델, 방향) -> 토큰 수
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    def op(self, name):
+        stats = self.ops.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.ops.setdefault(name, OpStats(name))
+        return stats
+
+    def log(self, event):
+        if not LOG_PATH: return
+        line = json.dumps(event, ensure_ascii=False)
+        with self._log_lock:
+            try:
+                with open(LOG_PATH, "a", encoding="utf-8") as f: f.write(line + "\n")
+            except OSError:
+                pass  # 로그 실패가 화면/배치 처리를 막지 않도록
+
+
+REGISTRY = Registry()
+
+
+def timed(name):
+    """함수 실행 시간을 name 연산으로 기록하는 데코레이터."""
+    def decorate(fn):
+        if not ENABLED: return fn
+        stats = REGISTRY.op(name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try: return fn(*args, **kwargs)
+            finally: stats.observe(time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def span(name):
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try: yield
+    finally: REGISTRY.op(name).observe(time.perf_counter() - started)
+
+
+def record_ai_call(model, prompt_chars, latency, prompt_tokens=0, output_tokens=0, cache_hit=False,
+                   stream=False, first_token=None, error=None):
+    if not ENABLED: return
+    REGISTRY.op("ai.stream" if stream else "ai.generate").observe(latency)
+    if first_token is not None: REGISTRY.op("ai.first_token").observe(first_token)
+    status = error or "ok"
+    event = {"ts": time.time(), "type": "ai_call", "model": model, "prompt_chars": prompt_chars,
+             "latency_ms": round(latency * 1000, 1), "prompt_tokens": prompt_tokens, "output_tokens": output_tokens,
+             "cache_hit": cache_hit, "stream": stream, "status": status,
+             "first_token_ms": round(first_token * 1000, 1) if first_token is not None else None}
+    with REGISTRY._lock:
+        REGISTRY.ai_totals[(model, "hit" if cache_hit else "miss", status)] += 1
+        REGISTRY.ai_tokens[(model, "prompt")] += prompt_tokens
+        REGISTRY.ai_tokens[(model, "output")] += output_tokens
+        REGISTRY.ai_calls.append(event)
+    REGISTRY.log(event)
+
+
+def start_rerun(label="app"):
+    """현재 스레드(세션의 스크립트 실행)에서 리런 집계를 시작합니다. 끝나지 않은 이전 집계는 버립니다."""
+    if ENABLED: _current_rerun.set(RerunTrace(label))
+
+
+def finish_rerun():
+    """리런 합계와 연산별 내역을 기록하고 반환합니다 (집계 중이 아니면 None)."""
+    trace = _current_rerun.get()
+    if trace is None: return None
+    _current_rerun.set(None)
+    total = time.perf_counter() - trace.started
+    REGISTRY.op(f"rerun.{trace.label}").observe(total)
+    result = {"ts": time.time(), "type": "rerun", "label": trace.label, "total_ms": round(total * 1000, 1),
+              "ops": {op: {"ms": round(sec * 1000, 2), "calls": trace.calls[op]}
+                      for op, sec in trace.ops.most_common()}}
+    REGISTRY.log(result)
+    return result
+
+
+def snapshot():
+    """연산별 count / total / p50 / p95 / max (누적 시간 순)."""
+    return sorted((s.summary() for s in list(REGISTRY.ops.values())), key=lambda r: -r["total_ms"])
+
+
+def recent_ai_calls(n=20):
+    with REGISTRY._lock:
+        return list(REGISTRY.ai_calls)[-n:][::-1]
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def render_prometheus():
+    lines = ["# HELP legal_op_duration_seconds Duration of instrumented operations.",
+             "# TYPE legal_op_duration_seconds histogram"]
+    for stats in sorted(list(REGISTRY.ops.values()), key=lambda s: s.name):
+        with stats._lock:
+            buckets, count, total = list(stats.buckets), stats.count, stats.total
+        op, cumulative = _label(stats.name), 0
+        for bound, n in zip(BUCKETS + (float("inf"),), buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'legal_op_duration_seconds_bucket{{op="{op}",le="{le}"}} {cumulative}')
+        lines.append(f'legal_op_duration_seconds_sum{{op="{op}"}} {total}')
+        lines.append(f'legal_op_duration_seconds_count{{op="{op}"}} {count}')
+    with REGISTRY._lock:
+        totals, tokens = dict(REGISTRY.ai_totals), dict(REGISTRY.ai_tokens)
+    lines += ["# HELP legal_ai_calls_total Gemini calls by model, cache result and status.",
+              "# TYPE legal_ai_calls_total counter"]
+    for (model, cache, status), n in sorted(totals.items()):
+        lines.append(f'legal_ai_calls_total{{model="{_label(model)}",cache="{cache}",status="{_label(status)}"}} {n}')
+    lines += ["# HELP legal_ai_tokens_total Estimated Gemini tokens by direction.",
+              "# TYPE legal_ai_tokens_total counter"]
+    for (model, direction), n in sorted(tokens.items()):
+        lines.append(f'legal_ai_tokens_total{{model="{_label(model)}",direction="{direction}"}} {n}')
+    return "\n".join(lines) + "\n"
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_exporters(port=METRICS_PORT):
+    """LEGAL_METRICS_PORT 가 설정되어 있으면 /metrics HTTP 엔드포인트를 프로세스당 한 번 띄웁니다."""
+    global _server
+    if not port or not ENABLED: return None
+    with _server_lock:
+        if _server is not None: return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            _server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+        except OSError:
+            return None  # 이미 다른 프로세스가 포트를 사용 중
+        threading.Thread(target=_server.serve_forever, name="metrics-exporter", daemon=True).start()
+        return _server
+
+
+def is_admin(token):
+    return bool(ADMIN_TOKEN) and bool(token) and hmac.compare_digest(str(token), ADMIN_TOKEN)